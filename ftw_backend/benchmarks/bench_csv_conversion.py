@@ -0,0 +1,110 @@
+"""
+Benchmark the DataFrame -> transaction conversion of the CSV import.
+
+Compares the old row-by-row conversion (iterrows + one TransactionCreate per row)
+with the columnar prepare_transactions + CSV_handler._convert_df_to_records path.
+
+Usage (from ftw_backend/):
+    python benchmarks/bench_csv_conversion.py --rows 100000
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+SRC_DIR: Path = Path(__file__).resolve().parents[1] / "src"
+
+# The services import the database module, so point it to an in-memory database
+os.environ.setdefault("FTW_DATABASE_URL", "sqlite://")
+os.chdir(SRC_DIR)
+sys.path.insert(0, str(SRC_DIR))
+
+from pandas import DataFrame  # noqa: E402
+from database.schemas import CounterpartSchema  # noqa: E402
+from models.transaction import TransactionCreate  # noqa: E402
+from services import CSV_handler  # noqa: E402
+from utils.bank_profiles import BANK_PROFILES  # noqa: E402
+from utils.csv_parsing import convert_to_ISO_format, prepare_transactions  # noqa: E402
+
+logger: logging.Logger = logging.getLogger("BaseLogger")
+
+
+def build_df(n_rows: int, n_counterparts: int) -> DataFrame:
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+    counterparts = [f"counterpart {i}" for i in range(n_counterparts)]
+
+    return DataFrame({
+        "Rekening": ["BE71 0961 2345 6769"] * n_rows,
+        "Boekingsdatum": [(start + timedelta(days=rng.randrange(3650))).strftime("%d/%m/%Y") for _ in range(n_rows)],
+        "Rekening tegenpartij": [""] * n_rows,
+        "Naam tegenpartij bevat": [rng.choice(counterparts) for _ in range(n_rows)],
+        "Transactie": [""] * n_rows,
+        "Bedrag": [f"{rng.uniform(-2500, 2500):.2f}".replace(".", ",") for _ in range(n_rows)],
+        "Mededelingen": [f"payment {i}" for i in range(n_rows)],
+    })
+
+
+def legacy_convert(df: DataFrame, counterpart_map: dict[str, CounterpartSchema]) -> list[TransactionCreate]:
+    # Row-by-row conversion as it was done before the columnar path
+    transactions: list[TransactionCreate] = []
+    for _, row in df.iterrows():
+        counterpart: CounterpartSchema = counterpart_map[row["Naam tegenpartij bevat"]]
+        transaction: TransactionCreate = TransactionCreate(
+            owner_iban=row["Rekening"],
+            counterpart_id=counterpart.id,
+            value=Decimal(row["Bedrag"].replace(",", ".")),
+            date_executed=convert_to_ISO_format(row["Boekingsdatum"]),
+            description=row["Mededelingen"],
+        )
+        logger.debug(f"Added transaction: {transaction.__dict__}")
+        transactions.append(transaction)
+
+    return transactions
+
+
+def columnar_convert(handler: CSV_handler, df: DataFrame, counterpart_map: dict[str, CounterpartSchema]) -> list[dict]:
+    # The conversion steps CSV_handler runs for every account slice
+    profile = BANK_PROFILES[0]
+    raw: DataFrame = df[list(profile.columns.values())].rename(columns={column: canonical for canonical, column in profile.columns.items()})
+    prepared: DataFrame = prepare_transactions(raw, profile).transactions
+    handler._offset_fingerprints(prepared)
+    return handler._convert_df_to_records(prepared, account_id=1, counterpart_map=counterpart_map)
+
+
+def timed(label: str, func, n_rows: int) -> float:
+    start: float = time.perf_counter()
+    func()
+    elapsed: float = time.perf_counter() - start
+    print(f"{label:<10} {elapsed:8.3f} s  {n_rows / elapsed:>12,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--counterparts", type=int, default=3_000)
+    args = parser.parse_args()
+
+    # Keep the per-row debug logging cost, but not the terminal output
+    logger.setLevel(logging.WARNING)
+
+    df: DataFrame = build_df(args.rows, args.counterparts)
+    counterpart_map: dict[str, CounterpartSchema] = {
+        name: CounterpartSchema(id=i, name=name) for i, name in enumerate(df["Naam tegenpartij bevat"].unique())
+    }
+    handler: CSV_handler = CSV_handler(file=None)
+
+    print(f"Converting {args.rows:,} rows ({args.counterparts:,} counterparts)")
+    before: float = timed("before", lambda: legacy_convert(df, counterpart_map), args.rows)
+    after: float = timed("after", lambda: columnar_convert(handler, df, counterpart_map), args.rows)
+    print(f"speedup    {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the serialization of large transaction lists (GET /transaction, /transaction/page, ...).
+
+Builds a list of synthetic TransactionTableView models and times how long it takes to turn it into
+the response body:
+  - default: FastAPI's path for a returned value (validate against the response_model, convert to
+    Python primitives, encode with json.dumps in JSONResponse)
+  - pydantic: PydanticJSONResponse, which dumps the models with pydantic-core in one pass
+Both bodies are checked to be identical.
+
+Usage (from ftw_backend/):
+    python benchmarks/bench_serialization.py --rows 50000
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+SRC_DIR: Path = Path(__file__).resolve().parents[1] / "src"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per serializer")
+    args = parser.parse_args()
+
+    # Importing the controllers creates the database engine, no tables are used
+    work_dir: str = tempfile.mkdtemp()
+    os.environ["FTW_DATABASE_URL"] = f"sqlite:///{work_dir}/bench_serialization.db"
+    os.chdir(SRC_DIR)
+    sys.path.insert(0, str(SRC_DIR))
+
+    import logging
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute, serialize_response
+    from controllers.responses import PydanticJSONResponse
+    from controllers.transaction_controller import TRANSACTION_VIEWS_ADAPTER
+    from models.counterpart import CounterpartView
+    from models.transaction import TransactionTableView
+
+    logging.getLogger("BaseLogger").setLevel(logging.WARNING)
+
+    transactions: list[TransactionTableView] = [
+        TransactionTableView(
+            id=i,
+            category_id=i % 20 or None,
+            category_name=f"category {i % 20}" if i % 20 else None,
+            category_type_name="Expenses" if i % 20 else None,
+            counterpart_id=i % 500,
+            counterpart=CounterpartView(id=i % 500, name=f"counterpart {i % 500}"),
+            owner_iban="BE71 0961 2345 6769",
+            value=Decimal(-(i % 10_000)).scaleb(-2),
+            date_executed=date(2020, 1, 1) + timedelta(days=i % 2_000),
+            description=f"payment {i}",
+        )
+        for i in range(args.rows)
+    ]
+
+    # The response field FastAPI builds for response_model=list[TransactionTableView]
+    route: APIRoute = APIRoute("/transaction", lambda: None, response_model=list[TransactionTableView])
+
+    def default() -> bytes:
+        content = asyncio.run(serialize_response(field=route.response_field, response_content=transactions))
+        return JSONResponse(content).body
+
+    def pydantic() -> bytes:
+        return PydanticJSONResponse(transactions, adapter=TRANSACTION_VIEWS_ADAPTER).body
+
+    bodies: dict[str, bytes] = {}
+    medians: dict[str, float] = {}
+    for name, serialize in [("default", default), ("pydantic", pydantic)]:
+        timings: list[float] = []
+        for _ in range(args.repeat):
+            start: float = time.perf_counter()
+            bodies[name] = serialize()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        medians[name] = statistics.median(timings)
+        print(f"{name:<10} {args.rows:,} rows  median {medians[name]:8.1f} ms  max {max(timings):8.1f} ms  {len(bodies[name]):,} bytes")
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    if bodies["default"] != bodies["pydantic"]:
+        raise SystemExit("Serializers produced different bodies")
+    print(f"Identical bodies, speedup {medians['default'] / medians['pydantic']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
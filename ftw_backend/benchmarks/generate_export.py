@@ -0,0 +1,131 @@
+"""
+Generate a synthetic bank export in the Belgian (be_nl) CSV layout the importer reads.
+
+Rows are spread over several owner accounts (valid Belgian IBANs) and sorted by booking date,
+newest first, like a combined export of all accounts. Counterparty names follow a long-tailed
+distribution: a few shops and employers appear often, most counterparties only a few times.
+
+Usage (from ftw_backend/):
+    python benchmarks/generate_export.py export.csv --rows 100000 --accounts 3 --counterparts 2000 --days 1825
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+HEADER: list[str] = ["Rekening", "Boekingsdatum", "Rekening tegenpartij", "Naam tegenpartij bevat", "Transactie", "Bedrag", "Mededelingen"]
+
+COUNTERPART_KINDS: list[tuple[str, str]] = [
+    ("supermarket", "Betaling met debetkaart"),
+    ("bakery", "Betaling met debetkaart"),
+    ("pharmacy", "Betaling met debetkaart"),
+    ("restaurant", "Betaling met debetkaart"),
+    ("webshop", "Europese domiciliering"),
+    ("utilities", "Europese domiciliering"),
+    ("insurance", "Europese domiciliering"),
+    ("friend", "Overschrijving"),
+]
+
+
+def belgian_iban(rng: random.Random) -> str:
+    """
+    Random Belgian IBAN with a valid national check (mod 97) and IBAN check digits.
+    """
+    account: int = rng.randrange(10**9, 10**10)
+    national_check: int = account % 97 or 97
+    bban: str = f"{account:010d}{national_check:02d}"
+    # "BE00" moved to the end, with B=11 and E=14
+    check_digits: int = 98 - int(bban + "111400") % 97
+
+    return f"BE{check_digits:02d}{bban}"
+
+
+def format_iban(iban: str) -> str:
+    return " ".join(iban[i:i + 4] for i in range(0, len(iban), 4))
+
+
+def format_amount(amount: float) -> str:
+    return f"{amount:.2f}".replace(".", ",")
+
+
+def generate_export(path: Path, rows: int, accounts: int = 1, counterparts: int = 1_000, days: int = 365, end: date | None = None, seed: int = 42) -> list[str]:
+    """
+    Write a synthetic export to path.
+
+    Args:
+        path (Path): File to write.
+        rows (int): Number of transactions.
+        accounts (int): Number of owner accounts the rows are spread over.
+        counterparts (int): Number of distinct counterparties.
+        days (int): Date span of the export, ending at end.
+        end (date | None): Most recent booking date, today when None.
+        seed (int): Seed of the random generator, the same arguments produce the same file.
+
+    Returns:
+        list[str]: The (unformatted) IBANs of the owner accounts.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+
+    owner_ibans: list[str] = [belgian_iban(rng) for _ in range(accounts)]
+    counterpart_names: list[str] = ["Employer NV"] + [
+        f"{kind} {i}" for i, (kind, _) in enumerate(rng.choice(COUNTERPART_KINDS) for _ in range(counterparts - 1))
+    ]
+    counterpart_ibans: list[str] = [format_iban(belgian_iban(rng)) for _ in counterpart_names]
+    counterpart_types: dict[str, str] = {kind: transaction_type for kind, transaction_type in COUNTERPART_KINDS}
+    # Zipf-like weights, precomputed as cumulative weights for rng.choices
+    cumulative_weights: list[float] = list(accumulate(1 / (rank + 1) for rank in range(len(counterpart_names))))
+
+    # Sorted offsets from the end date, newest first like the bank exports
+    day_offsets: list[int] = sorted(rng.randrange(days) for _ in range(rows))
+    picks: list[int] = rng.choices(range(len(counterpart_names)), cum_weights=cumulative_weights, k=rows)
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(HEADER)
+
+        for i, (offset, pick) in enumerate(zip(day_offsets, picks)):
+            booking_date: date = end - timedelta(days=offset)
+            name: str = counterpart_names[pick]
+
+            if pick == 0:
+                amount: float = rng.uniform(2_000, 3_500)
+                transaction_type: str = "Overschrijving"
+                description: str = f"Loon {booking_date:%m/%Y}"
+            else:
+                kind: str = name.rsplit(" ", 1)[0]
+                amount = -rng.lognormvariate(3, 1)
+                transaction_type = counterpart_types[kind]
+                description = f"{transaction_type} {booking_date:%d/%m} ref {i:08d}"
+
+            writer.writerow([
+                format_iban(rng.choice(owner_ibans)),
+                booking_date.strftime("%d/%m/%Y"),
+                counterpart_ibans[pick],
+                name,
+                transaction_type,
+                format_amount(amount),
+                description,
+            ])
+
+    return owner_ibans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--counterparts", type=int, default=1_000)
+    parser.add_argument("--days", type=int, default=365, help="date span of the export")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    owner_ibans: list[str] = generate_export(args.path, args.rows, args.accounts, args.counterparts, args.days, seed=args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.path} (accounts: {', '.join(owner_ibans)})")
+
+
+if __name__ == "__main__":
+    main()
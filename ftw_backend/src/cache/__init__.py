@@ -0,0 +1,30 @@
+import os
+import tempfile
+from .backends import CacheBackend, MemoryCache, SqliteCache
+
+# Response cache configuration:
+#   FTW_RESPONSE_CACHE: memory (per worker process, default), sqlite (shared by the workers of one host) or off
+#   FTW_RESPONSE_CACHE_TTL: seconds an entry is kept
+#   FTW_RESPONSE_CACHE_SIZE: maximum number of entries
+#   FTW_RESPONSE_CACHE_BYTES: maximum total size of the entries, estimated as the length of their pickles
+#   FTW_RESPONSE_CACHE_PATH: file of the sqlite backend
+RESPONSE_CACHE_BACKEND: str = os.environ.get("FTW_RESPONSE_CACHE", "memory")
+RESPONSE_CACHE_TTL: float = float(os.environ.get("FTW_RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_SIZE: int = int(os.environ.get("FTW_RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_BYTES: int = int(os.environ.get("FTW_RESPONSE_CACHE_BYTES", 64 * 1024 * 1024))
+RESPONSE_CACHE_PATH: str = os.environ.get("FTW_RESPONSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "ftw_response_cache.db"))
+
+def create_response_cache() -> CacheBackend:
+    if RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryCache(ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_SIZE, max_bytes=RESPONSE_CACHE_BYTES)
+    if RESPONSE_CACHE_BACKEND == "sqlite":
+        return SqliteCache(path=RESPONSE_CACHE_PATH, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_SIZE, max_bytes=RESPONSE_CACHE_BYTES)
+    if RESPONSE_CACHE_BACKEND == "off":
+        return CacheBackend()
+
+    raise ValueError(f"Unknown response cache backend {RESPONSE_CACHE_BACKEND}")
+
+# The cache of this process, shared by all services
+response_cache: CacheBackend = create_response_cache()
+
+__all__ = ["CacheBackend", "MemoryCache", "SqliteCache", "create_response_cache", "response_cache"]
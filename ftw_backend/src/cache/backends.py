@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from threading import Lock, local
+from typing import Any
+from models.cache import CacheStats
+import pickle
+import sqlite3
+import time
+
+# ======================================================================================================== #
+#                                       CACHE BACKENDS
+# ======================================================================================================== #
+# A backend stores values per key and remembers the account of every key, so all entries of one
+# account can be dropped at once. Keys are built by ResponseCacheService.
+
+class CacheBackend():
+    """
+    Base class of the response cache backends: counts hits, misses and invalidations.
+    """
+    name: str = "off"
+
+    def __init__(self):
+        self._stats_lock: Lock = Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._invalidations: int = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Returns:
+            tuple[bool, Any]: Whether the key was found (and not expired), and its value.
+        """
+        found, value = self._get(key)
+        with self._stats_lock:
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        return found, value
+
+    def set(self, key: str, account_id: int, value: Any):
+        pass
+
+    def invalidate_account(self, account_id: int):
+        with self._stats_lock:
+            self._invalidations += 1
+        self._invalidate_account(account_id)
+
+    def get_stats(self) -> CacheStats:
+        with self._stats_lock:
+            return CacheStats(
+                backend=self.name, hits=self._hits, misses=self._misses, invalidations=self._invalidations,
+                entries=self._count_entries(), size_bytes=self._count_bytes(),
+            )
+
+    def _get(self, key: str) -> tuple[bool, Any]:
+        return False, None
+
+    def _invalidate_account(self, account_id: int):
+        pass
+
+    def _count_entries(self) -> int:
+        return 0
+
+    def _count_bytes(self) -> int:
+        return 0
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with a time to live, bounded by its number of entries and their estimated size.
+    Values are returned as stored, callers must not modify them.
+
+    The size of a value is estimated by the length of its pickle, which follows the number of rows of
+    a result closely. A value larger than max_bytes on its own is not cached.
+    """
+    name: str = "memory"
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.lock: Lock = Lock()
+        # key -> (account_id, expires_at, size, value), least recently used first
+        self.entries: OrderedDict[str, tuple[int, float, int, Any]] = OrderedDict()
+        self.account_keys: dict[int, set[str]] = {}
+        self.total_bytes: int = 0
+
+    def set(self, key: str, account_id: int, value: Any):
+        size: int = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+
+            self.entries[key] = (account_id, time.monotonic() + self.ttl, size, value)
+            self.account_keys.setdefault(account_id, set()).add(key)
+            self.total_bytes += size
+
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def _get(self, key: str) -> tuple[bool, Any]:
+        with self.lock:
+            entry: tuple[int, float, int, Any] | None = self.entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                return False, None
+
+            self.entries.move_to_end(key)
+            return True, entry[3]
+
+    def _invalidate_account(self, account_id: int):
+        with self.lock:
+            for key in list(self.account_keys.get(account_id, ())):
+                self._remove(key)
+
+    def _count_entries(self) -> int:
+        return len(self.entries)
+
+    def _count_bytes(self) -> int:
+        return self.total_bytes
+
+    def _remove(self, key: str):
+        account_id, _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+        keys: set[str] = self.account_keys[account_id]
+        keys.discard(key)
+        if not keys:
+            del self.account_keys[account_id]
+
+class SqliteCache(CacheBackend):
+    """
+    Cache in a local SQLite file, shared by the uvicorn workers of one host. Values are pickled.
+    Expired entries are purged, and the oldest ones dropped above max_entries or max_bytes of pickled values,
+    every PURGE_INTERVAL writes or once a tenth of max_bytes was written since the last purge.
+    A value larger than max_bytes on its own is not cached.
+    """
+    name: str = "sqlite"
+
+    # Writes between two purges of expired and surplus entries
+    PURGE_INTERVAL: int = 50
+
+    def __init__(self, path: str, ttl: float, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.path: str = path
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        # sqlite3 connections cannot be shared between the threads of the threadpool
+        self._local: local = local()
+        self._writes: int = 0
+        self._bytes_written: int = 0
+
+        connection: sqlite3.Connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache "
+            "(key TEXT PRIMARY KEY, account_id INTEGER NOT NULL, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_account_id ON response_cache (account_id)")
+
+    def set(self, key: str, account_id: int, value: Any):
+        data: bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+
+        connection: sqlite3.Connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO response_cache (key, account_id, expires_at, value) VALUES (?, ?, ?, ?)",
+            (key, account_id, time.time() + self.ttl, data),
+        )
+
+        self._writes += 1
+        self._bytes_written += len(data)
+        if self._writes % self.PURGE_INTERVAL == 0 or self._bytes_written * 10 >= self.max_bytes:
+            self._purge(connection)
+            self._bytes_written = 0
+
+    def _get(self, key: str) -> tuple[bool, Any]:
+        row = self._connection().execute("SELECT value FROM response_cache WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        if row is None:
+            return False, None
+
+        return True, pickle.loads(row[0])
+
+    def _invalidate_account(self, account_id: int):
+        self._connection().execute("DELETE FROM response_cache WHERE account_id = ?", (account_id,))
+
+    def _count_entries(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM response_cache").fetchone()[0]
+
+    def _count_bytes(self) -> int:
+        return self._connection().execute("SELECT coalesce(sum(length(value)), 0) FROM response_cache").fetchone()[0]
+
+    def _purge(self, connection: sqlite3.Connection):
+        connection.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+        # Keep the newest entries while both their number and their running total size fit
+        connection.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            "SELECT key FROM (SELECT key, row_number() OVER newest_first AS n, sum(length(value)) OVER newest_first AS size "
+            "FROM response_cache WINDOW newest_first AS (ORDER BY expires_at DESC, key)) "
+            "WHERE n > ? OR size > ?)",
+            (self.max_entries, self.max_bytes),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit: every statement is its own transaction, other workers see it right away
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.connection = connection
+
+        return connection
@@ -2,4 +2,5 @@ from .category_controller import categorie_controller
 from .transaction_controller import transaction_controller
 from .counterpart_controller import counterpart_controller
 from .account_controller import account_controller
-from .category_type_controller import category_type_controller
\ No newline at end of file
+from .category_type_controller import category_type_controller
+from .cache_controller import cache_controller
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from models.cache import CacheStats
+from services import ResponseCacheService
+
+cache_controller = APIRouter(
+    prefix="/cache",
+)
+
+response_cache_service: ResponseCacheService = ResponseCacheService()
+
+# ======================================================================================================== #
+#                                       GETTER FUNCTIONS
+# ======================================================================================================== #
+
+@cache_controller.get("/stats", response_model=CacheStats)
+async def get_cache_stats():
+    """
+    Hit and miss counters of the response cache of the worker that answers, and its number of entries.
+    """
+    return response_cache_service.get_stats()
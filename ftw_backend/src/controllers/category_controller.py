@@ -2,15 +2,18 @@ from fastapi import APIRouter, Depends, Header  # type: ignore
 from sqlalchemy.orm import Session  # type: ignore
 from typing import Annotated, Any
 from database.schemas import CategorySchema, CategoryTypeSchema
-from models.category import CategoryView, CategoryCreate, CategoryEdit
+from models.category import Category, CategoryView, CategoryCreate, CategoryEdit
 from database import get_db
-from services import CategoryService, AccountService, CounterpartService, CategoryTypeService
+from services import CategoryService, AccountService, CounterpartService, CategoryTypeService, ResponseCacheService
 from utils.logging import setup_loggers
 from logging import Logger, DEBUG
 from fastapi import HTTPException  # type: ignore
 from datetime import datetime
 from pydantic import BaseModel
 from models.account import Account
+from .data_version import check_data_version
+from .responses import PydanticJSONResponse
+from pydantic import TypeAdapter
 
 # ======================================================================================================== #
 #                                       SETUP FUNCTIONS
@@ -43,6 +46,10 @@ category_service: CategoryService = CategoryService()
 account_service: AccountService = AccountService()
 counterpart_service: CounterpartService = CounterpartService()
 category_type_service: CategoryTypeService = CategoryTypeService()
+response_cache_service: ResponseCacheService = ResponseCacheService()
+
+# Serializer of the category list (PydanticJSONResponse)
+CATEGORIES_ADAPTER: TypeAdapter = TypeAdapter(list[Category])
 
 # ======================================================================================================== #
 #                                       CREATE FUNCTIONS
@@ -63,8 +70,8 @@ def create_category(active_account_id: Annotated[str, Header()], category: Categ
 #                                       GET FUNCTIONS
 # ======================================================================================================== #
 # Get all categories
-@categorie_controller.get("", )
-async def get_all_categories(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)):
+@categorie_controller.get("")
+async def get_all_categories(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db), data_version_headers: dict[str, str] = Depends(check_data_version)):
     if active_account_id is None:
         logger.error(active_account)
         raise HTTPException(status_code=400, detail="Active account ID header is missing")
@@ -72,11 +79,14 @@ async def get_all_categories(active_account_id: Annotated[str, Header()], db: Se
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))
     owner_id: int = active_account.id
     
-    result = category_service.get_all_categories(owner_id=owner_id, db=db)
-    return result
+    result = response_cache_service.get_or_build(
+        db, "categories", account_id=owner_id, params={},
+        build=lambda: category_service.get_all_categories(owner_id=owner_id, db=db),
+    )
+    return PydanticJSONResponse(result, adapter=CATEGORIES_ADAPTER, headers=data_version_headers)
 
 # Get a certain category based on id
-@categorie_controller.get("/{category_id}", response_model=CategoryView)
+@categorie_controller.get("/{category_id}", response_model=CategoryView, dependencies=[Depends(check_data_version)])
 def get_category(active_account_id: Annotated[str, Header()], category_id: int, db: Session = Depends(get_db)):
     # Check if the account exists
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))
@@ -4,7 +4,7 @@ from typing import Annotated, Any
 from database.schemas import CategorySchema
 from models.category import CategoryView, CategoryCreate, CategoryEdit
 from database import get_db
-from services import CategoryService, AccountService, CounterpartService, CategoryTypeService
+from services import CategoryService, AccountService, CounterpartService, CategoryTypeService, ResponseCacheService
 from utils.logging import setup_loggers
 from logging import Logger, DEBUG
 from fastapi import HTTPException  # type: ignore
@@ -15,6 +15,7 @@ from database.schemas import CategoryTypeSchema
 from exceptions.exceptions import AccountNotFoundException
 from models.type_overview import YearOverview, MonthOverview
 from models.category_type import CategoryTypeTableView
+from .data_version import check_data_version
 
 logger: Logger = setup_loggers()
 # logger.setLevel(DEBUG)
@@ -27,6 +28,7 @@ category_service: CategoryService = CategoryService()
 account_service: AccountService = AccountService()
 counterpart_service: CounterpartService = CounterpartService()
 category_type_service: CategoryTypeService = CategoryTypeService()
+response_cache_service: ResponseCacheService = ResponseCacheService()
 
 
 @category_type_controller.get("", response_model = list[CategoryTypeTableView])
@@ -34,7 +36,7 @@ def get_all_types(db: Session = Depends(get_db)):
     category_types: list[CategoryTypeSchema] = category_type_service.get_all_category_types(db=db)
     return [CategoryTypeTableView.from_schema(ct) for ct in category_types]
 
-@category_type_controller.get("/overview/month/all")
+@category_type_controller.get("/overview/month/all", dependencies=[Depends(check_data_version)])
 def get_type_overview(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db), year: int | None = None, month: int | None = None) -> list[MonthOverview]:
     # Check if the account exists
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))
@@ -42,14 +44,17 @@ def get_type_overview(active_account_id: Annotated[str, Header()], db: Session =
     if not active_account:
         raise AccountNotFoundException(active_account_id)
 
-    category_types: list[CategoryTypeSchema] = category_type_service.get_all_category_types(active_account=active_account, db=db)
-    type_overview_response = []
-    for c_type in category_types:
-        type_overview_response.append(category_type_service.get_type_month_breakdown(type_name=c_type.name, db=db, year=year, month=month, active_account=active_account))
+    def build_type_overview() -> list[MonthOverview]:
+        category_types: list[CategoryTypeSchema] = category_type_service.get_all_category_types(db=db)
+        type_overview_response = []
+        for c_type in category_types:
+            type_overview_response.append(category_type_service.get_type_month_breakdown(type_name=c_type.name, db=db, year=year, month=month, active_account=active_account))
 
-    return type_overview_response
+        return type_overview_response
 
-@category_type_controller.get("/overview/year")
+    return response_cache_service.get_or_build(db, "type_overview", account_id=active_account.id, params={"year": year, "month": month}, build=build_type_overview)
+
+@category_type_controller.get("/overview/year", dependencies=[Depends(check_data_version)])
 def get_year_overview(active_account_id: Annotated[str, Header()], year: int, db: Session = Depends(get_db)) -> YearOverview:
      # Check if the account exists
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))
@@ -57,6 +62,9 @@ def get_year_overview(active_account_id: Annotated[str, Header()], year: int, db
     if not active_account:
         raise AccountNotFoundException(active_account_id)
 
-    year_overview_response: YearOverview = category_type_service.get_year_overview(year=year, db=db, active_account=active_account)
+    year_overview_response: YearOverview = response_cache_service.get_or_build(
+        db, "year_overview", account_id=active_account.id, params={"year": year},
+        build=lambda: category_type_service.get_year_overview(year=year, db=db, active_account=active_account),
+    )
 
     return year_overview_response
\ No newline at end of file
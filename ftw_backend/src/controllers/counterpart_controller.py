@@ -2,12 +2,15 @@ from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 from typing import Annotated
 from database.schemas import CounterpartSchema
-from models.counterpart import CounterpartCreate
+from models.counterpart import Counterpart, CounterpartCreate
 from services import CounterpartService, AccountService, CategoryService
 from database import get_db
 from utils.logging import setup_loggers
 from logging import Logger
 from fastapi import HTTPException
+from .data_version import check_data_version
+from .responses import PydanticJSONResponse
+from pydantic import TypeAdapter
 
 # ======================================================================================================== #
 #                                       SETUP FUNCTIONS
@@ -21,21 +24,24 @@ counterpart_controller = APIRouter(
     prefix="/counterpart",
 )
 
+# Serializer of the counterpart lists (PydanticJSONResponse)
+COUNTERPARTS_ADAPTER: TypeAdapter = TypeAdapter(list[Counterpart])
+
 # ======================================================================================================== #
 #                                       GET FUNCTIONS
 # ======================================================================================================== #
 
 # Get all counterparts
 @counterpart_controller.get("")
-def get_all_counterparts(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)):
+def get_all_counterparts(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db), data_version_headers: dict[str, str] = Depends(check_data_version)):
     """
     Get all counterparts.
     """
     counterparts = counterpart_service.get_all_counterparts(db, owner_id=int(active_account_id))
-    return counterparts
+    return PydanticJSONResponse(counterparts, adapter=COUNTERPARTS_ADAPTER, headers=data_version_headers)
 
 # Get all counterparts for a category
-@counterpart_controller.get("/{category_id}/counterparts", response_model=list[str])
+@counterpart_controller.get("/{category_id}/counterparts", response_model=list[str], dependencies=[Depends(check_data_version)])
 def read_names(active_account_id: Annotated[str, Header()], category_id: int, db: Session = Depends(get_db)):
      # Check if the account exists
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))
@@ -48,7 +54,7 @@ def read_names(active_account_id: Annotated[str, Header()], category_id: int, db
     return [counterpart.name for counterpart in category.counterparts]
 
 # Get all counterpart names
-@counterpart_controller.get("/names")
+@counterpart_controller.get("/names", dependencies=[Depends(check_data_version)])
 def get_counterpart_names(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)):
     """
     Get all counterpart names.
@@ -58,12 +64,12 @@ def get_counterpart_names(active_account_id: Annotated[str, Header()], db: Sessi
 
 # Get all counterparts that don't have a category
 @counterpart_controller.get("/empty")
-def get_empty_counterparts(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)):
+def get_empty_counterparts(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db), data_version_headers: dict[str, str] = Depends(check_data_version)):
     """
     Get all empty counterparts.
     """
     counterparts = counterpart_service.get_empty_counterparts(db, owner_id=int(active_account_id))
-    return counterparts
+    return PydanticJSONResponse(counterparts, adapter=COUNTERPARTS_ADAPTER, headers=data_version_headers)
 
 # ======================================================================================================== #
 #                                       CREATE FUNCTIONS
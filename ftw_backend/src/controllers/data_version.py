@@ -0,0 +1,55 @@
+from fastapi import Depends, Header, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from typing import Annotated
+from database import get_db
+from services import AccountService
+
+# ======================================================================================================== #
+#                                       SETUP FUNCTIONS
+# ======================================================================================================== #
+
+account_service: AccountService = AccountService()
+
+# ======================================================================================================== #
+#                                       DEPENDENCY FUNCTIONS
+# ======================================================================================================== #
+
+def check_data_version(request: Request, response: Response, active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)) -> dict[str, str]:
+    """
+    Conditional GET on the data version of the active account. Answers 304 Not Modified when the
+    If-None-Match header holds the current ETag, before the endpoint reads any transactions.
+    Otherwise the ETag headers are set on the response and returned, for endpoints that build their own Response.
+    """
+    if not active_account_id.isdigit():
+        return {}
+
+    data_version: int | None = account_service.get_data_version(account_id=int(active_account_id), db=db)
+    if data_version is None:
+        return {}
+
+    etag: str = f'W/"{int(active_account_id)}-{data_version}"'
+    headers: dict[str, str] = {
+        "ETag": etag,
+        # Revalidate on every use, and keep a cached response per account
+        "Cache-Control": "no-cache",
+        "Vary": "active-account-id",
+    }
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return headers
+
+# ======================================================================================================== #
+#                                       HELPER FUNCTIONS
+# ======================================================================================================== #
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" and "x" match
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag.removeprefix("W/") in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
@@ -0,0 +1,26 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing import Any, Mapping
+
+# ======================================================================================================== #
+#                                       RESPONSE CLASSES
+# ======================================================================================================== #
+
+class PydanticJSONResponse(Response):
+    """
+    JSON response written by pydantic-core (TypeAdapter.dump_json) in one pass.
+
+    FastAPI validates a returned value against the response_model again, converts it to Python
+    primitives and then encodes those with json.dumps. For models the services just built, return
+    this response instead: it skips all three steps and produces the same JSON.
+    Returned responses bypass the response_model (keep it on the route for the OpenAPI schema)
+    and the headers dependencies set on the injected Response, so pass those as headers.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Any, adapter: TypeAdapter, headers: Mapping[str, str] | None = None, status_code: int = 200):
+        self.adapter: TypeAdapter = adapter
+        super().__init__(content=content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
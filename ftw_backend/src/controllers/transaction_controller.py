@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Header
+from fastapi import APIRouter, Depends, UploadFile, File, Header, Query
 from sqlalchemy.orm import Session
-from typing import Annotated
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Iterator
 from database.schemas import TransactionSchema
-from models.transaction import Transaction, TransactionTableView, TransactionCreate, TransactionEdit
-from models.account import is_IBAN
+from models.transaction import Transaction, TransactionTableView, TransactionCreate, TransactionEdit, TransactionPatch, TransactionPage, TransactionSearchPage, TransactionStats, SortOrder, ExportFormat
+from models.transaction_import import ImportJob
 from database import get_db
-from services import TransactionService, CSV_handler, AccountService
-from exceptions.exceptions import FileTypeExpection
+from database.database import SessionLocal
+from .data_version import check_data_version
+from .responses import PydanticJSONResponse
+from pydantic import TypeAdapter
+from services import TransactionService, AccountService, ImportJobService, ResponseCacheService, TransactionExportService
+from services.transaction_export_service import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES
+from exceptions.exceptions import FileTypeExpection, ObjectNotFoundException, UnknownBankFormatException
 from fastapi import HTTPException  # type: ignore
 from utils.logging import setup_loggers
 from logging import Logger
+from tempfile import NamedTemporaryFile
+from utils.bank_profiles import sniff_bank_profile
+from datetime import date
+import os
 
 # ======================================================================================================== #
 #                                       SETUP FUNCTIONS
@@ -23,6 +33,24 @@ transaction_controller = APIRouter(
 
 transaction_service: TransactionService = TransactionService()
 account_service: AccountService = AccountService()
+import_job_service: ImportJobService = ImportJobService()
+response_cache_service: ResponseCacheService = ResponseCacheService()
+transaction_export_service: TransactionExportService = TransactionExportService()
+
+# Size of the pieces in which an upload is copied to disk
+UPLOAD_COPY_SIZE: int = 1024 * 1024
+# Number of transactions per page of GET /transaction/page
+DEFAULT_PAGE_SIZE: int = 50
+MAX_PAGE_SIZE: int = 500
+# Period filters: month 0 (or none) selects the whole year. The period ends on January 1st of
+# year + 1, which must still be a valid date
+YearQuery = Annotated[int | None, Query(ge=1, le=9998)]
+MonthQuery = Annotated[int | None, Query(ge=0, le=12)]
+
+# Serializers of the list responses (PydanticJSONResponse)
+TRANSACTION_VIEWS_ADAPTER: TypeAdapter = TypeAdapter(list[TransactionTableView])
+TRANSACTION_PAGE_ADAPTER: TypeAdapter = TypeAdapter(TransactionPage)
+TRANSACTION_SEARCH_PAGE_ADAPTER: TypeAdapter = TypeAdapter(TransactionSearchPage)
 
 # ======================================================================================================== #
 #                                       CREATE FUNCTIONS
@@ -32,22 +60,40 @@ account_service: AccountService = AccountService()
 async def add_transactions(active_account_id: Annotated[str, Header()], transactions: list[TransactionCreate], db : Session = Depends(get_db)):
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
 
-    added_transaction: Transaction = transaction_service.add_transactions(transactions, db=db)
+    added_transaction: Transaction = transaction_service.add_transactions(transactions, db=db, active_account=active_account)
     
     db.commit()
     return added_transaction
 
-@transaction_controller.post("/upload_csv")
-async def upload_csv(active_account_id: Annotated[str, Header()], file: UploadFile = File(...), db: Session = Depends(get_db)):
+@transaction_controller.post("/upload_csv", response_model=ImportJob, status_code=202)
+def upload_csv(active_account_id: Annotated[str, Header()], file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Start a background import of a CSV file. Poll GET /transaction/import/{job_id} for its progress.
+    Files of an unknown bank format are rejected here (400), everything else is checked by the job.
+    Parse errors end up in the errors of the job instead of the response: rows with an unparseable date
+    or amount are skipped and counted as failed.
+    """
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
 
     if not file.filename.endswith('.csv'):
         raise FileTypeExpection(file_type=file.filename.split('.')[-1])
-    
-    file_handler: CSV_handler = CSV_handler(file=file)
-    file_handler.process_file(db=db, owner_account=active_account)
 
-    db.commit()
+    # The upload is closed when this request ends, so the job gets its own copy. The endpoint is
+    # a plain def, so this blocking copy runs in the threadpool instead of on the event loop
+    file.file.seek(0)
+    with NamedTemporaryFile(suffix=".csv", delete=False) as f_out:
+        while chunk := file.file.read(UPLOAD_COPY_SIZE):
+            f_out.write(chunk)
+
+    # Sniff the bank format now, so an unknown export gets a 400 instead of a failed job
+    try:
+        with open(f_out.name, "rb") as f_in:
+            sniff_bank_profile(f_in.readline())
+    except UnknownBankFormatException:
+        os.remove(f_out.name)
+        raise
+
+    return import_job_service.submit_import(file_path=f_out.name, file_name=file.filename, owner_account=active_account)
     
 # ======================================================================================================== #
 #                                       GET FUNCTIONS
@@ -55,7 +101,7 @@ async def upload_csv(active_account_id: Annotated[str, Header()], file: UploadFi
 
 
 @transaction_controller.get("", response_model=list[TransactionTableView])
-async def get_all_transactions(active_account_id: Annotated[str, Header()], db : Session = Depends(get_db), year: int | None = None, month: int | None = None):
+async def get_all_transactions(active_account_id: Annotated[str, Header()], db : Session = Depends(get_db), year: YearQuery = None, month: MonthQuery = None, data_version_headers: dict[str, str] = Depends(check_data_version)):
     """
     Get all transactions either as list of TransactionTableView. These can be filtered based on a date.
 
@@ -70,47 +116,181 @@ async def get_all_transactions(active_account_id: Annotated[str, Header()], db :
     """
     
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
-    account_iban: str = active_account.iban
 
-    logger.info(f"Getting transactions for IBAN: {account_iban}, year: {year}, month: {month}" )
+    logger.info(f"Getting transactions for account: {active_account.id}, year: {year}, month: {month}" )
 
-    if not is_IBAN(account_iban):
-        logger.error(f"IBAN is wrong!")
-    account_iban: str = account_service.format_IBAN(account_iban)
-    
-    results = transaction_service.get_all_transactions(db, iban=account_iban, year=year, month=month, as_schema=True)
+    transactions: list[TransactionTableView] = response_cache_service.get_or_build(
+        db, "transactions", account_id=active_account.id, params={"year": year, "month": month},
+        build=lambda: transaction_service.get_transaction_table_views(db, account_id=active_account.id, year=year, month=month),
+    )
+    return PydanticJSONResponse(transactions, adapter=TRANSACTION_VIEWS_ADAPTER, headers=data_version_headers)
+
+@transaction_controller.get("/stream", response_class=StreamingResponse)
+async def stream_transactions(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db), year: YearQuery = None, month: MonthQuery = None, data_version_headers: dict[str, str] = Depends(check_data_version)):
+    """
+    Stream the transactions as NDJSON: one TransactionTableView per line, newest first. Rows are
+    sent while they are read, for exports and the all-time view of large accounts.
+    """
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
+
+    # A returned Response does not get the headers the dependency set
+    return StreamingResponse(_stream_transaction_lines(account_id=active_account.id, year=year, month=month), media_type="application/x-ndjson", headers=data_version_headers)
+
+@transaction_controller.get("/export", response_class=StreamingResponse)
+async def export_transactions(
+    active_account_id: Annotated[str, Header()],
+    db: Session = Depends(get_db),
+    data_version_headers: dict[str, str] = Depends(check_data_version),
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.PARQUET,
+    columns: Annotated[list[str] | None, Query()] = None,
+    start: date | None = None,
+    end: date | None = None,
+):
+    """
+    Export the transactions as a Parquet file or an Arrow IPC stream, oldest first, for notebooks and other tools.
+    Optionally only the transactions between start and end (inclusive) and only some columns, given as
+    repeated or comma separated columns parameters. The file is written while the rows are read.
+    """
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))
+
+    selected_columns: list[str] = [column for value in columns for column in value.split(",") if column] if columns else list(EXPORT_COLUMNS)
+    unknown_columns: list[str] = [column for column in selected_columns if column not in EXPORT_COLUMNS]
+    if unknown_columns:
+        raise HTTPException(status_code=400, detail=f"Unknown columns {unknown_columns}, choose from {list(EXPORT_COLUMNS)}")
+    if len(set(selected_columns)) != len(selected_columns):
+        raise HTTPException(status_code=400, detail="Columns can only be selected once")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="The start of the export lies after its end")
+
+    headers: dict[str, str] = {
+        **data_version_headers,
+        "Content-Disposition": f'attachment; filename="transactions.{export_format}"',
+    }
+    return StreamingResponse(
+        _stream_transaction_export(account_id=active_account.id, export_format=export_format, columns=selected_columns, start=start, end=end),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+@transaction_controller.get("/import/{job_id}", response_model=ImportJob)
+async def get_import_job(active_account_id: Annotated[str, Header()], job_id: str):
+    """
+    Get the progress of an import job. Jobs of other accounts are not found.
+    """
+    job: ImportJob | None = import_job_service.get_job(job_id, owner_id=int(active_account_id))
+    if job is None:
+        raise ObjectNotFoundException("Import job", job_id)
+
+    return job
 
-    return [TransactionTableView.from_schema(tx) for tx in results]
+# Needs to be in front of "get /{transaction_id}", otherwise it will parse "page", "search" and "stats" as an int!!
+@transaction_controller.get("/page", response_model=TransactionPage)
+async def get_transaction_page(
+    active_account_id: Annotated[str, Header()],
+    db: Session = Depends(get_db),
+    data_version_headers: dict[str, str] = Depends(check_data_version),
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    order: SortOrder = SortOrder.DESC,
+    year: YearQuery = None,
+    month: MonthQuery = None,
+):
+    """
+    Get one page of transactions as TransactionTableView, sorted on date. Pass the returned next_cursor
+    to get the next page, it is None on the last page. These can be filtered based on a date.
+    """
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
+
+    transactions, next_cursor = transaction_service.get_transaction_page(db, account_id=active_account.id, limit=limit, cursor=cursor, order=order, year=year, month=month)
+
+    return PydanticJSONResponse(TransactionPage(items=transactions, next_cursor=next_cursor), adapter=TRANSACTION_PAGE_ADAPTER, headers=data_version_headers)
+
+@transaction_controller.get("/search", response_model=TransactionSearchPage)
+async def search_transactions(
+    active_account_id: Annotated[str, Header()],
+    q: Annotated[str, Query(min_length=1)],
+    db: Session = Depends(get_db),
+    data_version_headers: dict[str, str] = Depends(check_data_version),
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    offset: Annotated[int, Query(ge=0)] = 0,
+):
+    """
+    Search the transactions on their description and counterpart name, best matches first.
+    Pass the returned next_offset to get the next page, it is None on the last page.
+    """
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))
+
+    transactions, next_offset = transaction_service.search_transactions(db, account_id=active_account.id, search_text=q, limit=limit, offset=offset)
+
+    return PydanticJSONResponse(TransactionSearchPage(items=transactions, next_offset=next_offset), adapter=TRANSACTION_SEARCH_PAGE_ADAPTER, headers=data_version_headers)
+
+@transaction_controller.get("/stats", response_model=TransactionStats, dependencies=[Depends(check_data_version)])
+async def get_transaction_stats(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)):
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
+
+    return transaction_service.get_transaction_stats(db=db, account_id=active_account.id)
 
 # Needs to be in front of "get /{transaction_id}", otherwise it will parse "total" as an int!!
-@transaction_controller.get("/total", response_model=dict[str, float])
-async def calculate_total_amount(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db)):
+@transaction_controller.get("/total", response_model=dict[str, float], dependencies=[Depends(check_data_version)])
+async def calculate_total_amount(active_account_id: Annotated[str, Header()], db: Session = Depends(get_db), year: YearQuery = None, month: MonthQuery = None):
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
     
-    total_amount: dict[str, float] = transaction_service.calculate_total_amount_of_transactions(db=db, account=active_account)
+    total_amount: dict[str, float] = response_cache_service.get_or_build(
+        db, "total", account_id=active_account.id, params={"year": year, "month": month},
+        build=lambda: transaction_service.calculate_total_amount_of_transactions(db=db, account=active_account, year=year, month=month),
+    )
     return total_amount
 
-@transaction_controller.get("/{transaction_id}", response_model=TransactionTableView)
+@transaction_controller.get("/{transaction_id}", response_model=TransactionTableView, dependencies=[Depends(check_data_version)])
 async def get_transaction(active_account_id: Annotated[str, Header()], transaction_id: int, db: Session = Depends(get_db)):
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
-    account_iban: str = active_account.iban
     
-    selected_transaction: Transaction = transaction_service.get_transaction(transaction_id=transaction_id, db=db, iban=account_iban)
+    selected_transaction: Transaction = transaction_service.get_transaction(transaction_id=transaction_id, db=db, account_id=active_account.id)
     if selected_transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
     return TransactionTableView.from_schema(selected_transaction)
 
+def _stream_transaction_lines(account_id: int, year: int | None, month: int | None) -> Iterator[str]:
+    # The get_db session is closed before a streaming body is sent, so the stream opens its own
+    db: Session = SessionLocal()
+    try:
+        for views in transaction_service.stream_transaction_table_views(db, account_id=account_id, year=year, month=month):
+            yield "".join(view.model_dump_json() + "\n" for view in views)
+    finally:
+        db.close()
+
+def _stream_transaction_export(account_id: int, export_format: ExportFormat, columns: list[str], start: date | None, end: date | None) -> Iterator[bytes]:
+    # Like _stream_transaction_lines, the export reads with its own session
+    db: Session = SessionLocal()
+    try:
+        yield from transaction_export_service.stream_export(db, account_id=account_id, export_format=export_format, columns=columns, start=start, end=end)
+    finally:
+        db.close()
+
 # ======================================================================================================== #
 #                                       UPDATE FUNCTIONS
 # ======================================================================================================== #
 
+@transaction_controller.patch("/batch", response_model=list[TransactionTableView])
+async def patch_transactions(active_account_id: Annotated[str, Header()], patches: list[TransactionPatch], db: Session = Depends(get_db)):
+    """
+    Apply a list of {id, changes} edits in one transaction. Only the fields set in changes are updated.
+    Returns the patched transactions.
+    """
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))
+
+    transaction_ids: list[int] = transaction_service.patch_transactions(patches=patches, db=db, active_account=active_account)
+    db.commit()
+
+    patched: list[TransactionTableView] = transaction_service.get_transaction_table_views(db, account_id=active_account.id, transaction_ids=transaction_ids)
+    return PydanticJSONResponse(patched, adapter=TRANSACTION_VIEWS_ADAPTER)
+
 @transaction_controller.post("/{transaction_id}", response_model=TransactionTableView)
 async def edit_transaction(active_account_id: Annotated[str, Header()], transaction_id: int, updated_transaction: TransactionEdit, db: Session = Depends(get_db)):
     active_account = account_service.get_account(db=db, account_id=int(active_account_id))    
-    account_iban: str = active_account.iban
     
-    current_transaction: TransactionSchema = transaction_service.get_transaction(transaction_id=transaction_id, as_schema=True, db=db, iban=account_iban)
+    current_transaction: TransactionSchema = transaction_service.get_transaction(transaction_id=transaction_id, as_schema=True, db=db, account_id=active_account.id)
 
     if current_transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
@@ -125,11 +305,15 @@ async def edit_transaction(active_account_id: Annotated[str, Header()], transact
 
 
 @transaction_controller.delete("")
-async def delete_multiple_transactions(transaction_ids: list[int], db: Session = Depends(get_db)):
-    transaction_service.delete_multiple_transactions(transaction_ids=transaction_ids, db=db)
+async def delete_multiple_transactions(active_account_id: Annotated[str, Header()], transaction_ids: list[int], db: Session = Depends(get_db)):
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))
+
+    transaction_service.delete_multiple_transactions(transaction_ids=transaction_ids, db=db, account_id=active_account.id)
     db.commit()
 
 @transaction_controller.delete("/{transaction_id}")
-async def delete_transaction( transaction_id: int, db: Session = Depends(get_db)):
-    transaction_service.delete_transaction(transaction_id=transaction_id, db=db)
+async def delete_transaction(active_account_id: Annotated[str, Header()], transaction_id: int, db: Session = Depends(get_db)):
+    active_account = account_service.get_account(db=db, account_id=int(active_account_id))
+
+    transaction_service.delete_transaction(transaction_id=transaction_id, db=db, account_id=active_account.id)
     db.commit()
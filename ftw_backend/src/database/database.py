@@ -1,7 +1,9 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.engine.url import URL
+from sqlalchemy.engine.url import URL, make_url
 from .schemas import Base, CategoryTypeSchema
+from .migrations import run_migrations
 
 # Database information
 URL_DATABASE: URL = URL.create(
@@ -13,6 +15,10 @@ URL_DATABASE: URL = URL.create(
     database="FinancialTracker"
 )
 
+# Allow overriding the database (e.g. a local SQLite file for benchmarks)
+if os.environ.get("FTW_DATABASE_URL"):
+    URL_DATABASE = make_url(os.environ["FTW_DATABASE_URL"])
+
 engine = create_engine(URL_DATABASE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -58,4 +64,5 @@ def create_category_types():
 # Base.metadata.drop_all(bind=engine)
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 create_category_types()
\ No newline at end of file
@@ -0,0 +1,12 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+
+def dialect_insert(db: Session, schema):
+    """
+    Return the INSERT construct of the bound dialect, which supports ON CONFLICT.
+    PostgreSQL is used in production, SQLite for local runs and benchmarks.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(schema)
+
+    return postgresql.insert(schema)
@@ -0,0 +1,161 @@
+from sqlalchemy import BigInteger, Column, Connection, Engine, Table, cast, func, inspect, select, text, update, bindparam
+from .schemas import Base, AccountSchema, MonthlySummarySchema, TransactionSchema, CounterpartSchema
+from .search import create_sqlite_search_table
+from utils.csv_parsing import fingerprint_key, fingerprint
+import logging
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Rows updated per statement while backfilling
+BACKFILL_BATCH_SIZE: int = 10_000
+
+# ======================================================================================================== #
+#                                       MIGRATION FUNCTIONS
+# ======================================================================================================== #
+# create_all() only creates missing tables. These steps bring databases created by an older
+# version up to date. Every step is idempotent, so they run on every startup.
+
+def run_migrations(engine: Engine):
+    with engine.begin() as conn:
+        if _add_column(conn, TransactionSchema.__table__.c.fingerprint):
+            _backfill_transaction_fingerprints(conn)
+
+        if _add_column(conn, TransactionSchema.__table__.c.account_id):
+            _backfill_transaction_accounts(conn)
+        # Replaced by ix_transactions_account_date
+        _drop_indexes(conn, ["ix_transactions_owner_date", "ix_transactions_owner_iban"])
+
+        if _add_column(conn, TransactionSchema.__table__.c.value_cents):
+            _backfill_transaction_cents(conn)
+
+        # The summaries were keyed by owner_iban and summed Numeric totals, and could hold duplicate rows
+        # before the unique index. They are rebuilt on startup (SummaryService.rebuild_if_empty)
+        _recreate_derived_table(conn, MonthlySummarySchema.__table__, required_column="total_cents", required_index="ux_monthly_summaries_account_period_category")
+        # Replaced by ux_monthly_summaries_account_period_category
+        _drop_indexes(conn, ["ix_monthly_summaries_account_period"])
+
+        _add_column(conn, AccountSchema.__table__.c.data_version)
+
+        _create_missing_indexes(conn)
+
+        if conn.dialect.name == "sqlite":
+            create_sqlite_search_table(conn)
+
+# ======================================================================================================== #
+#                                       HELPER FUNCTIONS
+# ======================================================================================================== #
+
+def _add_column(conn: Connection, column: Column) -> bool:
+    """
+    Add a column to an existing table. Returns True when the column was added.
+    """
+    table_name: str = column.table.name
+    existing: set[str] = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return False
+
+    column_type: str = column.type.compile(dialect=conn.dialect)
+    references: str = "".join(f" REFERENCES {fk.column.table.name} ({fk.column.name})" for fk in column.foreign_keys)
+    # Existing rows get the server default, so a NOT NULL column needs one
+    default: str = ""
+    if column.server_default is not None:
+        default = f" DEFAULT {column.server_default.arg}" + ("" if column.nullable else " NOT NULL")
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}{default}{references}"))
+    logger.info(f"Added column {table_name}.{column.name}")
+
+    return True
+
+def _drop_indexes(conn: Connection, index_names: list[str]):
+    for index_name in index_names:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+def _recreate_derived_table(conn: Connection, table: Table, required_column: str, required_index: str | None = None):
+    """
+    Drop and recreate a table that only holds data derived from other tables, when it lacks a column or index.
+    """
+    existing: set[str] = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    if required_column in existing and (required_index is None or required_index in _get_index_names(conn, table.name)):
+        return
+
+    table.drop(conn)
+    table.create(conn)
+    logger.info(f"Recreated table {table.name}")
+
+def _create_missing_indexes(conn: Connection):
+    for table in Base.metadata.sorted_tables:
+        existing: set[str] = _get_index_names(conn, table.name)
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+
+def _get_index_names(conn: Connection, table_name: str) -> set[str]:
+    # The SQLite inspector skips expression indexes (ux_monthly_summaries_account_period_category)
+    if conn.dialect.name == "sqlite":
+        return set(conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table_name"), {"table_name": table_name}))
+
+    return {index["name"] for index in inspect(conn).get_indexes(table_name)}
+
+def _backfill_transaction_accounts(conn: Connection):
+    # The account with the same IBAN, compared without the formatting spaces
+    account_id_of_owner = (
+        select(func.min(AccountSchema.id))
+        .where(func.replace(AccountSchema.iban, " ", "") == func.replace(TransactionSchema.owner_iban, " ", ""))
+        .scalar_subquery()
+    )
+    result = conn.execute(
+        update(TransactionSchema.__table__)
+        .where(TransactionSchema.account_id.is_(None))
+        .values(account_id=account_id_of_owner)
+    )
+
+    logger.info(f"Backfilled the account of {result.rowcount} transactions")
+
+def _backfill_transaction_cents(conn: Connection):
+    # ROUND rounds half away from zero on both PostgreSQL and SQLite, like utils.money.to_cents
+    result = conn.execute(
+        update(TransactionSchema.__table__)
+        .where(TransactionSchema.value_cents.is_(None), TransactionSchema.value.is_not(None))
+        .values(value_cents=cast(func.round(TransactionSchema.value * 100), BigInteger))
+    )
+
+    logger.info(f"Backfilled the amount in cents of {result.rowcount} transactions")
+
+def _backfill_transaction_fingerprints(conn: Connection):
+    query = (
+        select(
+            TransactionSchema.id,
+            TransactionSchema.owner_iban,
+            TransactionSchema.date_executed,
+            TransactionSchema.value,
+            CounterpartSchema.name,
+            TransactionSchema.description,
+        )
+        .outerjoin(CounterpartSchema, TransactionSchema.counterpart_id == CounterpartSchema.id)
+        .order_by(TransactionSchema.id)
+    )
+    stmt = (
+        update(TransactionSchema.__table__)
+        .where(TransactionSchema.id == bindparam("tx_id"))
+        .values(fingerprint=bindparam("tx_fingerprint"))
+    )
+
+    # Number the duplicates in insertion order, like the CSV import numbers them in file order
+    key_occurrences: dict[str, int] = {}
+    batch: list[dict] = []
+    for tx_id, owner_iban, date_executed, value, counterpart_name, description in conn.execute(query).all():
+        if owner_iban is None or date_executed is None or value is None:
+            continue
+
+        key: str = fingerprint_key(owner_iban, date_executed, value, counterpart_name, description)
+        occurrence: int = key_occurrences.get(key, 0)
+        key_occurrences[key] = occurrence + 1
+
+        batch.append({"tx_id": tx_id, "tx_fingerprint": fingerprint(key, occurrence)})
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            conn.execute(stmt, batch)
+            batch = []
+
+    if batch:
+        conn.execute(stmt, batch)
+
+    logger.info("Backfilled transaction fingerprints")
@@ -1,25 +1,43 @@
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Integer, Column, String,  Date, DateTime, ForeignKey, UniqueConstraint, Boolean, Numeric
+from sqlalchemy import BigInteger, Integer, Column, String,  Date, DateTime, ForeignKey, UniqueConstraint, Boolean, Numeric, Index, DDL, event, text
 from datetime import datetime
 
 Base = declarative_base()
 
+# The trigram index on counterpart names needs the pg_trgm extension
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
 class TransactionSchema(Base):
     __tablename__ = "transactions"
+    # Serves the per-account period queries (date_executed >= start AND date_executed < end)
+    __table_args__ = (
+        Index("ix_transactions_account_date", "account_id", "date_executed"),
+        # Full-text search on descriptions, the expression must match database.search.description_search_vector.
+        # SQLite uses an FTS5 table instead (database.search).
+        Index("ix_transactions_description_search", text("to_tsvector('simple', description)"), postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     category = relationship("CategorySchema", back_populates="transactions", foreign_keys=[category_id])
 
-    owner_iban = Column(String, index=True)
+    # The owning account, every account-scoped query filters on it (ix_transactions_account_date)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
+    # The account number as it appears in the bank export, part of the import fingerprint
+    owner_iban = Column(String)
     
-    counterpart_id = Column(Integer, ForeignKey("counterparts.id"), nullable=True)
+    counterpart_id = Column(Integer, ForeignKey("counterparts.id"), index=True, nullable=True)
     counterpart = relationship("CounterpartSchema", foreign_keys=[counterpart_id], back_populates="transactions")
 
     value = Column(Numeric(12, 2), index=True)
+    # The same amount in integer cents, written together with value. Sums and aggregates use this column.
+    value_cents = Column(BigInteger, nullable=True)
     description = Column(String)
     date_executed = Column(Date, index=True)
+
+    # Deterministic identity of an imported transaction, used to skip re-uploaded rows
+    fingerprint = Column(String(64), unique=True, index=True, nullable=True)
     
     time_created = Column(DateTime, default=datetime.now)
     time_updated = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -56,7 +74,11 @@ class CategorySchema(Base):
 
 class CounterpartSchema(Base):
     __tablename__ = "counterparts"
-    __table_args__ = (UniqueConstraint("owner_id", "name", name="uq_counterpart_owner_name"),)
+    __table_args__ = (
+        UniqueConstraint("owner_id", "name", name="uq_counterpart_owner_name"),
+        # Serves the substring (ILIKE '%...%') search on counterpart names
+        Index("ix_counterparts_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
 
 
     id = Column(Integer, primary_key=True, index=True)
@@ -82,6 +104,9 @@ class AccountSchema(Base):
     name = Column(String, index=True)
     iban = Column(String, index=True)
 
+    # Incremented by every write to the data of this account, the ETag of its GET responses
+    data_version = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
 
 class CategoryTypeSchema(Base):
     __tablename__ = "category_types"
@@ -92,4 +117,25 @@ class CategoryTypeSchema(Base):
     icon = Column(String)
     is_positive = Column(Boolean, nullable=False)
 
-    categories = relationship("CategorySchema", back_populates="category_type")
\ No newline at end of file
+    categories = relationship("CategorySchema", back_populates="category_type")
+
+class MonthlySummarySchema(Base):
+    """
+    Count and sum of the transactions per account, month and category (NULL: uncategorized).
+    Maintained by SummaryService whenever transactions change, so overviews do not scan transactions.
+    """
+    __tablename__ = "monthly_summaries"
+    __table_args__ = (
+        # One row per account, month and category. coalesce: NULL categories would never conflict in a plain unique index
+        Index("ux_monthly_summaries_account_period_category", "account_id", "year", "month", text("coalesce(category_id, 0)"), unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    account_id = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    category_id = Column(Integer, index=True, nullable=True)
+
+    n_transactions = Column(Integer, nullable=False)
+    total_cents = Column(BigInteger, nullable=False)
@@ -0,0 +1,77 @@
+from sqlalchemy import Connection, column, func, literal_column, table, text
+from sqlalchemy.sql.elements import ColumnElement
+from .schemas import TransactionSchema
+import logging
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Text search configuration of the PostgreSQL description index. "simple" does not stem,
+# which fits the mix of Dutch, French and English in bank descriptions.
+SEARCH_CONFIG: str = "simple"
+
+# FTS5 table that indexes transactions on SQLite, rowid = transactions.id
+SEARCH_TABLE: str = "transactions_search"
+search_table = table(SEARCH_TABLE, column("rowid"), column("rank"))
+
+def description_search_vector() -> ColumnElement:
+    """
+    The tsvector of a transaction description. Must render exactly like the expression of
+    ix_transactions_description_search, otherwise PostgreSQL does not use the index.
+    """
+    return func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'"), TransactionSchema.description)
+
+# ======================================================================================================== #
+#                                       SQLITE FTS5 INDEX
+# ======================================================================================================== #
+# The FTS5 table holds a copy of the description and counterpart name of every transaction,
+# kept in sync by triggers. It is only created on SQLite (local runs and benchmarks).
+
+_SQLITE_SEARCH_DDL: list[str] = [
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(description, counterpart_name)",
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, description, counterpart_name)
+        VALUES (new.id, new.description, (SELECT name FROM counterparts WHERE id = new.counterpart_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON transactions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_update AFTER UPDATE OF description, counterpart_id ON transactions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        INSERT INTO {SEARCH_TABLE} (rowid, description, counterpart_name)
+        VALUES (new.id, new.description, (SELECT name FROM counterparts WHERE id = new.counterpart_id));
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_counterpart_update AFTER UPDATE OF name ON counterparts BEGIN
+        UPDATE {SEARCH_TABLE} SET counterpart_name = new.name
+        WHERE rowid IN (SELECT id FROM transactions WHERE counterpart_id = new.id);
+    END
+    """,
+]
+
+def create_sqlite_search_table(conn: Connection) -> bool:
+    """
+    Create and fill the FTS5 search table. Returns True when it was created.
+    """
+    exists: bool = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+    ).first() is not None
+    if exists:
+        return False
+
+    for statement in _SQLITE_SEARCH_DDL:
+        conn.execute(text(statement))
+
+    conn.execute(text(f"""
+        INSERT INTO {SEARCH_TABLE} (rowid, description, counterpart_name)
+        SELECT transactions.id, transactions.description, counterparts.name
+        FROM transactions LEFT OUTER JOIN counterparts ON transactions.counterpart_id = counterparts.id
+    """))
+    logger.info(f"Created search table {SEARCH_TABLE}")
+
+    return True
@@ -22,3 +22,16 @@ class AccountNotFoundException(ObjectNotFoundException):
 class CategoryNotFoundException(ObjectNotFoundException):
     def __init__(self, object_identifier):
         super().__init__("Category", object_identifier)
+
+class TransactionNotFoundException(ObjectNotFoundException):
+    def __init__(self, object_identifier):
+        super().__init__("Transaction", object_identifier)
+
+class CounterpartNotFoundException(ObjectNotFoundException):
+    def __init__(self, object_identifier):
+        super().__init__("Counterpart", object_identifier)
+
+class UnknownBankFormatException(Exception):
+    def __init__(self, header: str):
+        self.header: str = header
+        self.msg: str = f"Unsupported bank export, no bank profile matches the header: {self.header}"
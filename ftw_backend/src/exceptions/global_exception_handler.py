@@ -1,7 +1,7 @@
 from fastapi import Request, FastAPI
 from sqlalchemy.exc import NoResultFound
 from fastapi.exceptions import HTTPException, RequestValidationError
-from .exceptions import FormattingException, FileTypeExpection, AccountNotFoundException, ObjectNotFoundException
+from .exceptions import FormattingException, FileTypeExpection, AccountNotFoundException, ObjectNotFoundException, UnknownBankFormatException
 import logging
 
 logger: logging.Logger = logging.getLogger(__name__) 
@@ -22,6 +22,14 @@ def register_global_exception_handlers(app: FastAPI):
             detail=exc.msg
         )
     
+    @app.exception_handler(UnknownBankFormatException)
+    async def unknown_bank_format_exception_handler(request: Request, exc: UnknownBankFormatException):
+        logger.error(exc.msg)
+        raise HTTPException(
+            status_code=400,
+            detail=exc.msg
+        )
+
     @app.exception_handler(FileTypeExpection)
     async def file_type_exception_handler(request: Request, exc: FileTypeExpection):
         logger.error(exc.msg)
@@ -3,9 +3,11 @@ from logging import Logger
 from fastapi import FastAPI
 from utils.logging import setup_loggers
 from fastapi.middleware.cors import CORSMiddleware
-from controllers import transaction_controller, categorie_controller, counterpart_controller, account_controller, category_type_controller
+from controllers import transaction_controller, categorie_controller, counterpart_controller, account_controller, category_type_controller, cache_controller
 from exceptions.global_exception_handler import register_global_exception_handlers
-from database.database import create_category_types
+from database.database import SessionLocal, create_category_types
+from services import SummaryService
+from services.csv_handler import shutdown_parse_executor
 logger: Logger = setup_loggers()
 app = FastAPI()
 
@@ -14,6 +16,7 @@ app.include_router(categorie_controller)
 app.include_router(counterpart_controller)
 app.include_router(account_controller)
 app.include_router(category_type_controller)
+app.include_router(cache_controller)
 
 register_global_exception_handlers(app)
 
@@ -37,4 +40,19 @@ async def root():
 
 @app.on_event("startup")
 def seed_transaction_types():
-    create_category_types()
\ No newline at end of file
+    create_category_types()
+
+@app.on_event("startup")
+def build_monthly_summaries():
+    # Backfills the summary table of a database created before it existed
+    db = SessionLocal()
+    try:
+        SummaryService().rebuild_if_empty(db)
+        db.commit()
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def stop_parse_workers():
+    # Worker processes of the CSV imports, started by the first large import
+    shutdown_parse_executor()
@@ -0,0 +1,58 @@
+"""
+Maintenance commands, run from ftw_backend/src:
+
+    python manage.py rebuild-summaries [--account-id 1]
+    python manage.py check-summaries [--account-id 1]
+"""
+import argparse
+import sys
+from database.database import SessionLocal
+from services import SummaryService
+
+summary_service: SummaryService = SummaryService()
+
+
+def rebuild_summaries(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        summary_service.rebuild(db, account_id=args.account_id)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Rebuilt the monthly summaries of {f'account {args.account_id}' if args.account_id else 'all accounts'}")
+    return 0
+
+
+def check_summaries(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        inconsistencies: list[str] = summary_service.find_inconsistencies(db, account_id=args.account_id)
+    finally:
+        db.close()
+
+    for inconsistency in inconsistencies:
+        print(inconsistency)
+    print(f"{len(inconsistencies)} inconsistent monthly summaries")
+
+    return 1 if inconsistencies else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = commands.add_parser("rebuild-summaries", help="recompute the monthly summaries from the transactions")
+    rebuild_parser.add_argument("--account-id", type=int, default=None, help="only rebuild the summaries of this account")
+    rebuild_parser.set_defaults(func=rebuild_summaries)
+
+    check_parser = commands.add_parser("check-summaries", help="compare the monthly summaries with the transactions")
+    check_parser.add_argument("--account-id", type=int, default=None, help="only check the summaries of this account")
+    check_parser.set_defaults(func=check_summaries)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
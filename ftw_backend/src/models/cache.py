@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+# ======================================================================================================== #
+#                                       BASE CLASSES
+# ======================================================================================================== #
+
+class CacheStats(BaseModel):
+    backend: str
+    # Counted per worker process, entries are shared when the backend is
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    # Estimated total size of the entries
+    size_bytes: int = 0
@@ -6,6 +6,18 @@ from .counterpart import Counterpart, CounterpartView
 from .category import Category
 from decimal import Decimal
 
+# ======================================================================================================== #
+#                                       HELPER ENUMS
+# ======================================================================================================== #
+
+class SortOrder(StrEnum):
+    ASC = "asc"
+    DESC = "desc"
+
+class ExportFormat(StrEnum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
 # ======================================================================================================== #
 #                                       BASE CLASSES
 # ======================================================================================================== #
@@ -49,6 +61,11 @@ class TransactionEdit(BaseModel):
 
     model_config = {'from_attributes': True}
 
+class TransactionPatch(BaseModel):
+    id: int
+    # Only the fields that are set in changes are updated
+    changes: TransactionEdit
+
 class TransactionTableView(BaseModel):
     id: int
 
@@ -82,4 +99,44 @@ class TransactionTableView(BaseModel):
             value=t.value,
             date_executed=t.date_executed,
             description=t.description,
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "TransactionTableView":
+        """
+        Build the view from a row of TransactionService's table view query, without ORM objects.
+        """
+        # Validating a plain dict runs in pydantic-core and is cheaper than model_construct
+        return cls.model_validate({
+            "id": row.id,
+
+            "category_id": row.category_id,
+            "category_name": row.category_name,
+            "category_type_name": row.category_type_name,
+
+            "counterpart_id": row.counterpart_id,
+            "counterpart": {"id": row.counterpart_id, "name": row.counterpart_name} if row.counterpart_id is not None else None,
+
+            "owner_iban": row.owner_iban,
+
+            "value": row.value,
+            "date_executed": row.date_executed,
+            "description": row.description,
+        })
+
+class TransactionPage(BaseModel):
+    items: List[TransactionTableView]
+    # Pass as cursor to get the next page, None on the last page
+    next_cursor: Optional[str] = None
+
+class TransactionSearchPage(BaseModel):
+    items: List[TransactionTableView]
+    # Pass as offset to get the next page of results, None on the last page
+    next_offset: Optional[int] = None
+
+class TransactionStats(BaseModel):
+    n_transactions: int = 0
+    n_transactions_this_year: int = 0
+    # Transactions without a category
+    n_unprocessed: int = 0
+    last_date_executed: Optional[date] = None
@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from enum import StrEnum
+from datetime import datetime
+from typing import Optional
+
+# ======================================================================================================== #
+#                                       HELPER ENUMS
+# ======================================================================================================== #
+
+class ImportStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+# ======================================================================================================== #
+#                                       BASE CLASSES
+# ======================================================================================================== #
+
+class ImportSummary(BaseModel):
+    rows_processed: int = 0
+    rows_inserted: int = 0
+    rows_skipped: int = 0
+    rows_failed: int = 0
+    errors: list[str] = []
+
+class ImportJob(BaseModel):
+    id: str
+    # The account that uploaded the file, only it can poll the job
+    owner_id: int
+    file_name: str = ""
+    status: ImportStatus = ImportStatus.PENDING
+
+    rows_processed: int = 0
+    rows_inserted: int = 0
+    rows_skipped: int = 0
+    rows_failed: int = 0
+    errors: list[str] = []
+
+    time_created: datetime
+    time_finished: Optional[datetime] = None
@@ -3,15 +3,16 @@ from sqlalchemy.orm import Session  # type: ignore
 from .category_type import CategoryType
 from database.schemas import CategorySchema, TransactionSchema
 from typing import Any
+from decimal import Decimal
 
 @dataclass
 class CategorySummary:
     category_name: str = ""
-    category_amount: int = 0
+    category_amount: Decimal = Decimal(0)
 
 @dataclass
 class MonthOverview:
-    category_type: CategoryType = ""
+    type_name: str = ""
     type_overview: list[CategorySummary] = field(default_factory=list)
 
 @dataclass
@@ -3,4 +3,8 @@ from .transaction_service import TransactionService
 from .category_service import CategoryService
 from .account_service import AccountService
 from .counterpart_service import CounterpartService
-from .category_type_service import CategoryTypeService
\ No newline at end of file
+from .category_type_service import CategoryTypeService
+from .import_job_service import ImportJobService
+from .summary_service import SummaryService
+from .response_cache_service import ResponseCacheService
+from .transaction_export_service import TransactionExportService
@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session # type: ignore
+from sqlalchemy import select, update
+from typing import Iterable
 from models.account import Account, AccountCreate, AccountEdit
 from database.schemas import AccountSchema
 from utils.logging import setup_loggers
 import logging
 from exceptions.exceptions import AccountNotFoundException
+from cache import response_cache
 
 logger = setup_loggers()
 logger.setLevel(logging.DEBUG)
@@ -57,6 +60,12 @@ class AccountService:
             logger.error(f"Error retrieving account with IBAN {iban}: {e}")
             raise AccountNotFoundException(iban)
 
+    def get_data_version(self, account_id: int, db: Session) -> int | None:
+        """
+        The data version of an account (None when it does not exist), read without loading the account.
+        """
+        return db.scalar(select(AccountSchema.data_version).where(AccountSchema.id == account_id))
+
     # ======================================================================================================== #
     #                                       UPDATE FUNCTIONS
     # ======================================================================================================== #
@@ -69,6 +78,25 @@ class AccountService:
         updated_account: AccountSchema = self.convert_account_information(original_account, new_account)
 
         return updated_account
+
+    def bump_data_version(self, account_ids: Iterable[int], db: Session):
+        """
+        Increment the data version of the accounts whose transactions, categories or counterparts changed,
+        and drop their cached responses. Call it in the same transaction as the change, so the new version
+        commits together with it.
+        """
+        account_ids = {account_id for account_id in account_ids if account_id is not None}
+        if not account_ids:
+            return
+
+        db.execute(
+            update(AccountSchema)
+            .where(AccountSchema.id.in_(account_ids))
+            .values(data_version=AccountSchema.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        for account_id in account_ids:
+            response_cache.invalidate_account(account_id)
     
     def convert_account_information(self, to_model: Account | AccountSchema, from_model: AccountCreate) -> Account | AccountSchema:
         for field, value in from_model.model_dump(exclude_none=True).items():
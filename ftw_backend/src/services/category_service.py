@@ -1,12 +1,13 @@
 from models.category import Category, CategoryCreate, CategoryEdit
 from database.schemas import CategorySchema, CounterpartSchema, TransactionSchema, CategoryTypeSchema
 from sqlalchemy.orm import Session, joinedload  # type: ignore
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, update
 from models.transaction import Transaction
 from typing import Optional
 from models.counterpart import Counterpart
 from .counterpart_service import CounterpartService
 from .account_service import AccountService
+from .summary_service import SummaryMonth, SummaryService
 from fastapi import HTTPException  # type: ignore
 from logging import Logger
 from utils.logging import setup_loggers
@@ -34,6 +35,7 @@ class CategoryService():
     def __init__(self):
         self.counterpart_service: CounterpartService = CounterpartService()
         self.account_service : AccountService = AccountService()
+        self.summary_service: SummaryService = SummaryService()
 
     # ======================================================================================================== #
     #                                       CREATE FUNCTIONS
@@ -47,6 +49,7 @@ class CategoryService():
         current_category.owner_id = owner.id
         current_category.category_type_id = new_category.category_type.id
         db.add(current_category)
+        self.account_service.bump_data_version([owner.id], db=db)
 
         return current_category
     
@@ -100,6 +103,8 @@ class CategoryService():
             tx.category_name = updated_category.name
             tx.transaction_type = updated_category.category_type
 
+        self.account_service.bump_data_version([owner.id], db=db)
+
         return updated_category
 
     def convert_category_data(self, current_category: CategorySchema | Category, new_category: CategoryCreate | CategoryEdit, owner: Account, db: Session) -> CategorySchema:
@@ -195,23 +200,13 @@ class CategoryService():
 
         values = {
             TransactionSchema.category_id: category.id,
-            TransactionSchema.category_name: category.name,
-            TransactionSchema.transaction_type: category.category_type,
         }
 
         query = db.query(TransactionSchema).filter(TransactionSchema.id.in_(ids))
         updated = query.update(values, synchronize_session="fetch")
 
-        # Ensure ORM session objects reflect the relationship
-        try:
-            tx_rows = db.query(TransactionSchema).filter(TransactionSchema.id.in_(ids)).all()
-            for tx in tx_rows:
-                tx.category = category
-                tx.category_name = category.name
-                tx.transaction_type = category.category_type
-            db.flush()
-        except Exception:
-            logger.debug("flush or post-update sync in add_transaction_to_category failed or not required")
+        self.summary_service.refresh_months_of_transactions(db, TransactionSchema.id.in_(ids))
+        self.account_service.bump_data_version([category.owner_id], db=db)
 
         return updated
 
@@ -232,6 +227,13 @@ class CategoryService():
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
 
+        # Collect the summary months before the transactions are detached from the category
+        counterpart_ids: list[int] = [cp.id for cp in category.counterparts]
+        summary_months: set[SummaryMonth] = self.summary_service.get_months_of_transactions(
+            db,
+            or_(TransactionSchema.category_id == category.id, TransactionSchema.counterpart_id.in_(counterpart_ids)),
+        )
+
         # 1. Detach counterparts and fix their transactions (ORM-safe)
         for cp in list(category.counterparts):
             # Update transactions *through ORM*
@@ -247,6 +249,10 @@ class CategoryService():
 
         # 3. Delete category
         db.delete(category)
+        db.flush()
+
+        self.summary_service.refresh_months(db, summary_months)
+        self.account_service.bump_data_version([owner_account.id], db=db)
 
         return category
 
@@ -273,8 +279,6 @@ class CategoryService():
         category: CategorySchema | None,
         owner_account: Account
     ):
-        owner_iban: str = self.account_service.format_IBAN(owner_account.iban)
-
         # When there is a Category add the category_id to all transactions with that counterpart
         if category:
             logger.debug(f"Adding txs to {category.name} with cp {counterpart.name}")
@@ -288,10 +292,9 @@ class CategoryService():
                 TransactionSchema.category_id: None,
             }
 
-        # Match by counterpart_id OR (fallback) by normalized counterpart_name for existing rows that weren't linked by id.
         query = db.query(TransactionSchema).filter(
-            TransactionSchema.owner_iban==owner_iban,
-            or_(TransactionSchema.counterpart_id == counterpart.id, TransactionSchema.counterpart_name == counterpart.name)
+            TransactionSchema.account_id == owner_account.id,
+            TransactionSchema.counterpart_id == counterpart.id,
         )
 
         updated = query.update(values, synchronize_session="fetch")
@@ -303,6 +306,39 @@ class CategoryService():
         except Exception:
             logger.debug("flush after _sync_transactions_for_counterpart update failed or not required")
 
+        self.summary_service.refresh_months_of_transactions(
+            db,
+            TransactionSchema.account_id == owner_account.id,
+            TransactionSchema.counterpart_id == counterpart.id,
+        )
+        self.account_service.bump_data_version([owner_account.id], db=db)
+
+    def sync_categories_of_transactions(self, db: Session, first_id: int, last_id: int, account_ids: list[int]) -> int:
+        """
+        Set the category of the uncategorized transactions of the given accounts with an id in [first_id, last_id]
+        to the category of their counterpart, in one UPDATE ... FROM counterparts statement. Used after a CSV import.
+
+        Other imports and PUT /transaction can commit rows inside the id range, so it is not enough on its own:
+        rows of other accounts and transactions that already have a category are left alone.
+
+        Returns:
+            int: The number of updated transactions.
+        """
+        stmt = (
+            update(TransactionSchema)
+            .where(
+                TransactionSchema.id.between(first_id, last_id),
+                TransactionSchema.account_id.in_(account_ids),
+                TransactionSchema.category_id.is_(None),
+                TransactionSchema.counterpart_id == CounterpartSchema.id,
+                CounterpartSchema.category_id.is_not(None),
+            )
+            .values(category_id=CounterpartSchema.category_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        return db.execute(stmt).rowcount
+
     def filter_transactions_by_date(self, transactions: list[TransactionSchema], year: int, month: Optional[int] = None) -> list[Transaction]:
         if month is not None:
             filtered_transactions = [transaction for transaction in transactions if transaction.date_executed.year == year and transaction.date_executed.month == month]
@@ -2,13 +2,13 @@ from dataclasses import dataclass, field
 from sqlalchemy.orm import Session  # type: ignore
 from models.category_type import CategoryType
 from models.type_overview import CategorySummary, MonthOverview, YearOverview
-from database.schemas import CategorySchema, TransactionSchema, AccountSchema, CategoryTypeSchema
+from database.schemas import AccountSchema, CategoryTypeSchema
 from .category_service import CategoryService
 from .account_service import AccountService
-from datetime import date
+from .summary_service import SummaryService
 from typing import Any
-from sqlalchemy import extract
 from utils.logging import setup_loggers
+from utils.money import from_cents
 
 
 
@@ -19,6 +19,7 @@ class CategoryTypeService():
         self.logger = setup_loggers()
         self.category_service: CategoryService = CategoryService() 
         self.account_service: AccountService = AccountService()
+        self.summary_service: SummaryService = SummaryService()
 
     def get_all_category_types(self, db: Session):
         category_types: list[CategoryTypeSchema] = db.query(CategoryTypeSchema).all()
@@ -36,32 +37,19 @@ class CategoryTypeService():
 
         return category_type
 
-     # Go over all categories with the type_name matching this type and create CategorySummary
     def get_type_month_breakdown(self, active_account: AccountSchema, type_name: str, db: Session, year: int | None = None, month: int | None = None):
-        categories: list[CategorySchema] = self.category_service.get_all_categories_of_type(type_name=type_name, db=db, owner_id=active_account.id)
+        """
+        Sum per category of one category type, read from the monthly summaries.
+        A month of None or 0 covers the whole year.
+        """
+        category_totals = self.summary_service.get_totals_per_category(db=db, account_id=active_account.id, type_name=type_name, year=year, month=month)
 
         category_overview: list[CategorySummary] = []
-        
-        c: CategorySchema
-        for c in categories:
-            category_amount: int = 0
+        for category_name, category_cents, is_positive in category_totals:
+            if not is_positive:
+                category_cents = -category_cents
 
-            tx: TransactionSchema
-            for tx in c.transactions:
-                execution_date: date = tx.date_executed
-
-                if execution_date.year == year: 
-                    if month == 0 or execution_date.month == month:
-                        category_amount += tx.value
-
-            category_type: CategoryTypeSchema = c.category_type
-            if not category_type.is_positive:
-                category_amount = -category_amount
-
-            # Round the total amount
-            category_amount = round(category_amount, 2)
-
-            category_overview.append(CategorySummary(category_name=c.name, category_amount=category_amount))
+            category_overview.append(CategorySummary(category_name=category_name, category_amount=from_cents(category_cents)))
 
         # Order catergory summary list
         category_overview.sort(key = lambda summary: summary.category_amount, reverse=True)
@@ -70,38 +58,22 @@ class CategoryTypeService():
 
     def get_year_overview(self, year: int, db: Session, active_account: AccountSchema):
         months_str: list[str] = ["January", "Februari", "March", "April", "May", "June", "Juli", "August", "September","October", "November", "December"]
-        year_overview: list[dict[str, Any]] = []
 
-        active_iban: str = self.account_service.format_IBAN(active_account.iban)
+        category_types: dict[str, CategoryTypeSchema] = {c_type.name: c_type for c_type in self.get_all_category_types(db=db)}
 
-        # For each month:
-        for month in range(1,13):
-            # Get all transactions in that year and month
-            txs: list[TransactionSchema] = db.query(TransactionSchema).filter(
-                TransactionSchema.owner_iban==active_iban,
-                extract('year', TransactionSchema.date_executed) == year,
-                extract('month', TransactionSchema.date_executed) == month
-            ).all()
-
-            # self.logger.debug(f"Creating overview for month {month}")
-            month_name: str = months_str[month-1]
-
-            # Create initial overview
-            
+        # Create initial overview of every month
+        year_overview: list[dict[str, Any]] = []
+        for month_name in months_str:
             month_overview: dict[str, Any] = {"month": month_name}
-            for c_type in CategoryTypeSchema:
-                month_overview[c_type.name] = 0
-            
-            # For all transactions:
-            for tx in txs:
-                c: CategorySchema = tx.category
-                c_type: CategoryTypeSchema = c.category_type
-                if c_type.is_positive:
-                    month_overview[c_type.name] += tx.value
-                else:
-                    month_overview[c_type.name] -= tx.value
-                    
+            for type_name in category_types:
+                month_overview[type_name] = 0
             year_overview.append(month_overview)
 
-        return YearOverview(year_overview=year_overview)
+        # One summary row per month and category type
+        for month, type_name, total_cents in self.summary_service.get_totals_per_month_and_type(db=db, account_id=active_account.id, year=year):
+            if category_types[type_name].is_positive:
+                year_overview[month - 1][type_name] = from_cents(total_cents)
+            else:
+                year_overview[month - 1][type_name] = from_cents(-total_cents)
 
+        return YearOverview(year_overview=year_overview)
@@ -1,6 +1,14 @@
 from sqlalchemy.orm import Session, joinedload  # type: ignore
+from sqlalchemy import select
 from models.counterpart import Counterpart
 from database.schemas import CounterpartSchema
+from database.dialect import dialect_insert
+from .account_service import AccountService
+from typing import Iterator
+
+# Names per INSERT and IN (...) of the bulk functions: 2 bind parameters per inserted name, which has to
+# stay far below the parameter limits of PostgreSQL (65535) and SQLite (32766, 999 on old builds)
+NAME_BATCH_SIZE: int = 1_000
 
 class CounterpartService():
 
@@ -9,7 +17,7 @@ class CounterpartService():
     # ======================================================================================================== # 
 
     def __init__(self):
-        pass
+        self.account_service: AccountService = AccountService()
 
     # ======================================================================================================== #
     #                                       CREATE FUNCTIONS
@@ -27,8 +35,43 @@ class CounterpartService():
             category_id=getattr(new_counterpart, "category_id", None)
         )
         db.add(cp)
+        self.account_service.bump_data_version([owner_id], db=db)
         
         return cp
+
+    def upsert_counterparts(self, names: set[str], db: Session, owner_id: int) -> dict[str, CounterpartSchema]:
+        """
+        Get or create all counterparts with the given names for an owner in bulk.
+
+        Existing counterparts are fetched with IN queries, the missing ones are inserted
+        with INSERT ... ON CONFLICT DO NOTHING on uq_counterpart_owner_name, NAME_BATCH_SIZE names per statement.
+
+        Returns:
+            dict[str, CounterpartSchema]: Counterpart name -> persisted counterpart.
+        """
+        names = set(names)
+        if not names:
+            return {}
+
+        counterparts: dict[str, CounterpartSchema] = self._get_counterparts_by_names(db=db, names=names, owner_id=owner_id)
+
+        missing: set[str] = names - counterparts.keys()
+        if missing:
+            for batch in self._name_batches(missing):
+                stmt = (
+                    dialect_insert(db, CounterpartSchema)
+                    .values([{"name": name, "owner_id": owner_id} for name in batch])
+                    .on_conflict_do_nothing(index_elements=["owner_id", "name"])
+                )
+                created: list[CounterpartSchema] = db.scalars(stmt.returning(CounterpartSchema)).all()
+                counterparts.update({cp.name: cp for cp in created})
+
+            # Rows inserted concurrently by another import are not returned by ON CONFLICT DO NOTHING
+            missing -= counterparts.keys()
+            if missing:
+                counterparts.update(self._get_counterparts_by_names(db=db, names=missing, owner_id=owner_id))
+
+        return counterparts
     
     # ======================================================================================================== #
     #                                       GET FUNCTIONS
@@ -65,10 +108,23 @@ class CounterpartService():
         counterpart = query.first()
         return counterpart
     
+    def _get_counterparts_by_names(self, db: Session, names: set[str], owner_id: int) -> dict[str, CounterpartSchema]:
+        counterparts: dict[str, CounterpartSchema] = {}
+        for batch in self._name_batches(names):
+            query = select(CounterpartSchema).where(CounterpartSchema.owner_id == owner_id, CounterpartSchema.name.in_(batch))
+            counterparts.update({cp.name: cp for cp in db.scalars(query)})
+
+        return counterparts
+
+    def _name_batches(self, names: set[str]) -> Iterator[list[str]]:
+        # Sorted, so concurrent imports insert the same names in the same order
+        ordered: list[str] = sorted(names)
+        for start in range(0, len(ordered), NAME_BATCH_SIZE):
+            yield ordered[start:start + NAME_BATCH_SIZE]
+
     def get_counterpart_by_id(self, db: Session, id: int, owner_id: int) -> CounterpartSchema | None:
         query = db.query( CounterpartSchema).filter(CounterpartSchema.id == id)
         query = query.filter(CounterpartSchema.owner_id == owner_id)
 
         counterpart = query.first()
         return counterpart
-    
\ No newline at end of file
@@ -1,184 +1,317 @@
 from fastapi import UploadFile, Depends
 from utils.logging import setup_loggers
-from pandas import read_csv, DataFrame
-from io import BytesIO
+from pandas import DataFrame
 from database import get_db
 from sqlalchemy.orm import Session
 from .transaction_service import TransactionService
-from models.transaction import TransactionCreate
-from decimal import Decimal
-from models.counterpart import CounterpartCreate
 from models.account import Account
-from database.schemas import CounterpartSchema, CategorySchema, TransactionSchema
+from models.transaction_import import ImportSummary
+from database.schemas import CounterpartSchema, TransactionSchema
 from .category_service import CategoryService
 from .account_service import AccountService
 from .counterpart_service import CounterpartService
+from .summary_service import SummaryService
 from exceptions.exceptions import AccountNotFoundException
-import re
-from datetime import datetime
+from utils.csv_parsing import PreparedSlice, detect_date_format, prepare_transactions, read_export, fingerprint
+from utils.bank_profiles import BankProfile, sniff_bank_profile
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from pandas import Series
+from typing import BinaryIO, Callable, Iterator
+from contextlib import contextmanager
+import multiprocessing
+import time
 import logging
+import os
 logger = setup_loggers()
 logger.setLevel(logging.DEBUG)
 
+# Number of CSV rows that are read, converted and written at once
+DEFAULT_CHUNK_SIZE: int = 50_000
+# Chunks smaller than this are parsed inline, a worker process would cost more than it saves
+PARALLEL_MIN_ROWS: int = 20_000
+MAX_PARSE_WORKERS: int = 4
+# Rejected rows beyond this number are counted, but not listed in the summary
+MAX_REPORTED_ERRORS: int = 100
+
+# Worker processes parsing the slices of large chunks, shared by all imports of this process.
+# Created on first use and shut down with the app (shutdown_parse_executor)
+_parse_executor: ProcessPoolExecutor | None = None
+_parse_executor_lock: Lock = Lock()
+
+def get_parse_executor() -> Executor:
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            # Spawn instead of fork: the API process runs threads and holds database connections.
+            # Spawned workers are started on demand, up to max_workers
+            n_workers: int = min(MAX_PARSE_WORKERS, os.cpu_count() or 1)
+            _parse_executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"))
+
+        return _parse_executor
+
+def shutdown_parse_executor():
+    global _parse_executor
+    with _parse_executor_lock:
+        executor, _parse_executor = _parse_executor, None
+
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
 class CSV_handler():
     # ======================================================================================================== #
     #                                       SETUP FUNCTIONS
     # ======================================================================================================== # 
 
-    def __init__(self, file: UploadFile):
+    def __init__(self, file: UploadFile | BinaryIO, chunk_size: int | None = DEFAULT_CHUNK_SIZE, on_progress: Callable[[ImportSummary], None] | None = None):
+        """
+        Args:
+            file (UploadFile | BinaryIO): The uploaded CSV file, or an open binary file (background imports).
+            chunk_size (int | None): Rows per streamed chunk. None reads the whole file at once.
+            on_progress (Callable[[ImportSummary], None] | None): Called with the running totals after every chunk.
+        """
         self.file = file
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
         self.category_service = CategoryService()
         self.counterpart_service = CounterpartService()
         self.transaction_service = TransactionService()
         self.account_service = AccountService()
+        self.summary_service = SummaryService()
+
+        # Number of rows seen per fingerprint key (by hash) during the current import
+        self._key_occurrences: dict[int, int] = {}
+        # Bank profile of the file, sniffed from its header line by read_file
+        self.profile: BankProfile | None = None
+        # Date format of the current import, from the profile or detected once from the first chunk
+        self._date_format: str | None = None
+        # Seconds spent per import stage (read, prepare, counterparts, convert, insert, categorize)
+        self.stage_timings: dict[str, float] = {}
 
-    def read_file(self):
+    def read_file(self) -> Iterator[DataFrame]:
+        """
+        Read the spooled upload in chunks of chunk_size rows, without loading the raw bytes in memory.
+        The bank profile is selected from the header line, the chunks use its canonical column names.
+        """
         try:
-            contents = self.file.file.read()
-            return contents
+            stream: BinaryIO = self.file.file if isinstance(self.file, UploadFile) else self.file
+            stream.seek(0)
+            self.profile = sniff_bank_profile(stream.readline())
+            logger.debug(f"Importing file as bank profile {self.profile.name}")
+
+            stream.seek(0)
+            yield from read_export(stream, self.profile, chunk_size=self.chunk_size)
         except Exception as e:
             logger.error(f"Error reading file: {e}")
             raise e
         
-    def process_file(self, owner_account: Account, db: Session = Depends(get_db)):
-        # Convert file to DataFrame
-        df: DataFrame = self._convert_to_df()
-        df: DataFrame = self._clean_df(df)
+    def process_file(self, owner_account: Account, db: Session = Depends(get_db)) -> ImportSummary:
+        """
+        Import the file chunk by chunk. Every chunk is cleaned, converted and written
+        before the next one is read, so memory usage does not grow with the file size.
 
-        
-        # Export all different owner account numbers
-        owner_ibans: list[str] = df["Rekening"].unique().tolist()
-        
-        for owner_iban in owner_ibans:
-            logger.debug(f"Processing transactions for account number: {owner_iban}")
-            try:
-                owner_account : Account = self.account_service.get_account_by_iban(db=db, iban=owner_iban)
-                
-                # Gather all present counterparts. If not present, add them to the database
-                counterpart_map: dict[str, CounterpartSchema] = self._export_counterparts(df["Naam tegenpartij bevat"].unique(), db, owner_id=owner_account.id)
-                
-                # Convert DataFrame to transactions
-                new_transactions: list[TransactionCreate] = self._convert_df_to_transactions(df, counterpart_map=counterpart_map)
-                added_transaction: list[TransactionSchema] = self.transaction_service.add_transactions(new_transactions=new_transactions, db=db, active_account=owner_account)
-
-                # Ensure pending inserts are sent to the DB so subsequent Query.update() in
-                # _sync_transactions_for_counterpart can find and update the new rows.
+        Each chunk is split per owner account (owner_iban). The slices are parsed (and fingerprinted)
+        in the shared process pool, while their database writes stay serialized on this session.
+        Rows that were already imported (same fingerprint) are skipped, rows that
+        cannot be parsed are reported in the summary without aborting the import.
+
+        Returns:
+            ImportSummary: How many rows were read, newly inserted, skipped and rejected.
+        """
+        owner_accounts: dict[str, Account | None] = {}
+        inserted_id_range: tuple[int, int] | None = None
+        summary: ImportSummary = ImportSummary()
+        self._key_occurrences = {}
+        self._date_format = None
+        self.stage_timings = {}
+
+        for df in self._timed_chunks(self.read_file()):
+            summary.rows_processed += len(df)
+            account_slices: list[DataFrame] = [account_df for _, account_df in df.groupby("owner_iban", sort=False)]
+
+            if self._date_format is None:
+                self._date_format = self.profile.date_format or detect_date_format(df["booking_date"])
+                logger.debug(f"Using date format: {self._date_format}")
+            prepare = partial(prepare_transactions, profile=self.profile, date_format=self._date_format)
+
+            with self._timed("prepare"):
+                if len(account_slices) > 1 and len(df) >= PARALLEL_MIN_ROWS:
+                    prepared_slices: list[PreparedSlice] = self._prepare_in_pool(prepare, account_slices)
+                else:
+                    prepared_slices: list[PreparedSlice] = list(map(prepare, account_slices))
+
+            for prepared in prepared_slices:
+                self._report_rejected_rows(prepared.rejected, summary)
+                inserted_ids: list[int] = self._import_account_slice(prepared.transactions, owner_accounts, db, summary)
+                summary.rows_inserted += len(inserted_ids)
+                if inserted_ids:
+                    inserted_id_range = self._extend_id_range(inserted_id_range, inserted_ids)
+
+            # Ensure the chunk is sent to the DB before the next one is read
+            with self._timed("insert"):
                 db.flush()
-                
-                # Add/sync counterparts with categories
-                for counterpart in counterpart_map.values():
-                    if counterpart.category_id is not None:
-                        logger.debug(f"Adding counterpart {counterpart.name} to category {counterpart.category_id}")
-                        category: CategorySchema = self.category_service.get_category(db=db, category_id=counterpart.category_id, as_schema=True, owner_id=owner_account.id)
-                        self.category_service.add_counterpart_to_category(category=category, counterpart=counterpart, db=db, owner_account=owner_account)
-
-                logger.info("CSV file processed and transactions added successfully.")
-            
-            except AccountNotFoundException as e:
-                logger.error(f"Error processing transactions for account number {owner_iban}: {e.msg}")
-                continue
+            summary.rows_skipped = summary.rows_processed - summary.rows_inserted - summary.rows_failed
+            logger.debug(f"Processed {summary.rows_processed} rows")
+
+            if self.on_progress is not None:
+                self.on_progress(summary)
+
+        account_ids: list[int] = [account.id for account in owner_accounts.values() if account is not None]
+
+        # Give the new transactions the category of their counterpart
+        if inserted_id_range is not None:
+            with self._timed("categorize"):
+                n_categorized: int = self.category_service.sync_categories_of_transactions(db=db, first_id=inserted_id_range[0], last_id=inserted_id_range[1], account_ids=account_ids)
+            logger.debug(f"Categorized {n_categorized} imported transactions")
+
+            with self._timed("summaries"):
+                self.summary_service.refresh_months_of_transactions(db, TransactionSchema.id.between(*inserted_id_range), TransactionSchema.account_id.in_(account_ids))
+
+        # New transactions or counterparts of the accounts in the file
+        self.account_service.bump_data_version(account_ids, db=db)
+
+        logger.info(f"CSV file processed: {summary.rows_inserted} transactions added, {summary.rows_skipped} skipped, {summary.rows_failed} rejected.")
+        logger.debug("Import stage timings: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in self.stage_timings.items()))
+
+        return summary
     
     # ======================================================================================================== #
     #                                       HELPER FUNCTIONS
     # ======================================================================================================== #
-    
-    def _convert_to_df(self):
-        # Read the file contents
-        content = self.read_file()
-
-        csv_file = BytesIO(content)
-        # Load in using pandas
-        df: DataFrame = read_csv(csv_file, delimiter=";")
-        return df
-
-    def _clean_df(self, df: DataFrame) -> DataFrame:
-        useful_columns =  [
-        "Rekening",
-        "Boekingsdatum",
-        "Rekening tegenpartij",
-        "Naam tegenpartij bevat",
-        "Transactie",
-        "Bedrag",
-        "Mededelingen"
-        ]
-
-        df = df[useful_columns].copy()
-        
-        df["Rekening tegenpartij"] = df["Rekening tegenpartij"].fillna("")
-        df["Mededelingen"] = df["Mededelingen"].fillna("")
-        df["Naam tegenpartij bevat"] = df["Naam tegenpartij bevat"].fillna("")
-        df["Naam tegenpartij bevat"] = df["Naam tegenpartij bevat"].str.lower()
-        
-        
-        return df
-    
-    def _convert_to_ISO_format(self, date_str: str) -> str:
+
+    def _prepare_in_pool(self, prepare: Callable[[DataFrame], PreparedSlice], account_slices: list[DataFrame]) -> list[PreparedSlice]:
+        try:
+            return list(get_parse_executor().map(prepare, account_slices))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for its memory use), so the pool cannot run anything anymore.
+            # Drop it, the next import creates a new one
+            shutdown_parse_executor()
+            raise
+
+    def _import_account_slice(self, df: DataFrame, owner_accounts: dict[str, Account | None], db: Session, summary: ImportSummary) -> list[int]:
         """
-        Convert a date string to ISO format (YYYY-MM-DD).
-        Accepts common formats like DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD and falls
-        back to splitting non-digit separators. Always zero-pads month/day.
+        Write the parsed transactions of one owner account. Rows of an IBAN without account are
+        counted as failed, with one error per IBAN, so they are not reported as skipped duplicates.
+
+        Returns:
+            list[int]: The ids of the newly inserted transactions.
         """
+        if df.empty:
+            return []
+
+        owner_iban: str = df["owner_iban"].iat[0]
+        logger.debug(f"Processing {len(df)} transactions for account number: {owner_iban}")
+
+        first_seen: bool = owner_iban not in owner_accounts
+        owner_account: Account | None = self._get_owner_account(owner_iban, owner_accounts, db)
+        if owner_account is None:
+            summary.rows_failed += len(df)
+            if first_seen and len(summary.errors) < MAX_REPORTED_ERRORS:
+                summary.errors.append(f"Rows of account number {owner_iban} were not imported: no account has this IBAN")
+            return []
+
+        # Gather all present counterparts. If not present, add them to the database
+        with self._timed("counterparts"):
+            counterpart_map: dict[str, CounterpartSchema] = self._export_counterparts(df["counterpart_name"].unique(), db, owner_id=owner_account.id)
+
+        # Convert DataFrame to insert-ready transaction records
+        with self._timed("convert"):
+            self._offset_fingerprints(df)
+            new_records: list[dict] = self._convert_df_to_records(df, account_id=owner_account.id, counterpart_map=counterpart_map)
+
+        with self._timed("insert"):
+            return self.transaction_service.add_transaction_records(records=new_records, db=db)
+
+    @contextmanager
+    def _timed(self, stage: str):
+        start: float = time.perf_counter()
         try:
-            s = str(date_str).strip()
-            # try common exact formats first
-            for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%Y/%m/%d"):
-                try:
-                    return datetime.strptime(s, fmt).date().isoformat()
-                except ValueError:
-                    continue
-
-            # fallback: split by non-digit characters and reconstruct
-            parts = re.split(r"\D+", s)
-            parts = [p for p in parts if p]
-            if len(parts) >= 3:
-                # prefer day, month, year unless year looks like it's first
-                if len(parts[0]) == 4:
-                    y, m, d = parts[0], parts[1], parts[2]
-                else:
-                    d, m, y = parts[0], parts[1], parts[2]
+            yield
+        finally:
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + time.perf_counter() - start
 
-                return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+    def _timed_chunks(self, chunks: Iterator[DataFrame]) -> Iterator[DataFrame]:
+        """
+        Yield the chunks of read_file, timing only the reading of each chunk as the "read" stage.
+        """
+        while True:
+            with self._timed("read"):
+                df: DataFrame | None = next(chunks, None)
+            if df is None:
+                return
+            yield df
 
-            raise ValueError(f"Unrecognized date format: {date_str}")
+    def _extend_id_range(self, id_range: tuple[int, int] | None, ids: list[int]) -> tuple[int, int]:
+        first_id, last_id = min(ids), max(ids)
+        if id_range is not None:
+            first_id, last_id = min(first_id, id_range[0]), max(last_id, id_range[1])
 
-        except Exception as e:
-            logger.error(f"Error converting date to ISO format: {e} (input: {date_str})")
-            raise e
+        return first_id, last_id
 
-    def _convert_df_to_transactions(self, df: DataFrame, counterpart_map: dict[str, CounterpartSchema] = {}) -> list[TransactionCreate]:
-        transactions: list[TransactionCreate] = []
-        print(counterpart_map.items())
+    def _report_rejected_rows(self, rejected: list[str], summary: ImportSummary):
+        summary.rows_failed += len(rejected)
+
+        free_slots: int = max(0, MAX_REPORTED_ERRORS - len(summary.errors))
+        summary.errors.extend(rejected[:free_slots])
+
+    def _get_owner_account(self, owner_iban: str, owner_accounts: dict[str, Account | None], db: Session) -> Account | None:
+        """
+        Look up the account of an IBAN once per import, unknown accounts are cached as None.
+        """
+        if owner_iban not in owner_accounts:
+            try:
+                owner_accounts[owner_iban] = self.account_service.get_account_by_iban(db=db, iban=owner_iban)
+            except AccountNotFoundException as e:
+                logger.error(f"Error processing transactions for account number {owner_iban}: {e.msg}")
+                owner_accounts[owner_iban] = None
 
-        for _, row in df.iterrows():
+        return owner_accounts[owner_iban]
 
-            counterpart: CounterpartSchema = counterpart_map[row["Naam tegenpartij bevat"]]
-            date: str = self._convert_to_ISO_format(row["Boekingsdatum"])
+    def _convert_df_to_records(self, df: DataFrame, account_id: int, counterpart_map: dict[str, CounterpartSchema] = {}) -> list[dict]:
+        """
+        Convert a DataFrame from prepare_transactions into insert-ready transaction records.
+        All parsing already happened column-wise, so no Pydantic model is built per row.
+        """
+        counterpart_ids: dict[str, int] = {name: cp.id for name, cp in counterpart_map.items()}
 
-            transaction: TransactionCreate = TransactionCreate(
-                owner_iban = row["Rekening"],
-                counterpart_name = row["Naam tegenpartij bevat"],
-                counterpart_id = counterpart.id,
-                counterpart_iban = row["Rekening tegenpartij"],
-                value = Decimal(row["Bedrag"].replace(",",".")),  # The value is in euros
-                date_executed = date,  # Convert to YYYY-MM-DD format
-                description = row["Mededelingen"]
-            )
+        columns: dict[str, list] = {
+            "account_id": [account_id] * len(df),
+            "owner_iban": df["owner_iban"].tolist(),
+            "counterpart_id": df["counterpart_name"].map(counterpart_ids).tolist(),
+            "value": df["value"].tolist(),
+            "value_cents": df["value_cents"].tolist(),
+            "date_executed": df["date_executed"].tolist(),
+            "description": df["description"].tolist(),
+            "fingerprint": df["fingerprint"].tolist(),
+        }
 
-            logger.debug(f"Added transaction: {transaction.__dict__}")
-            transactions.append(transaction)
+        records: list[dict] = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        logger.debug(f"Converted {len(records)} rows to transaction records")
 
-        return transactions
+        return records
 
-    def _export_counterparts(self, counterparts: list[str], db: Session, owner_id: int):
+    def _offset_fingerprints(self, df: DataFrame):
         """
-        Export all counterparts to the database.
+        Continue the occurrence count of the earlier chunks of this import: prepare_transactions numbered
+        rows with identical keys within their slice only. Just the rows whose key was seen before are
+        fingerprinted again, the others keep the fingerprint of the worker.
         """
-        counterparts_map: dict[str, CounterpartSchema] = {}
-        # Add new counterparts to the database
-        for cp_name in counterparts:
-            if cp_name not in counterparts_map.keys():
-                cp: CounterpartSchema = self.counterpart_service.create_counterpart(new_counterpart=CounterpartCreate(name=cp_name, owner_id=owner_id), db=db, owner_id=owner_id)
-                counterparts_map[cp.name] = cp
+        # Only the key hashes are remembered between chunks, not the keys themselves
+        key_hashes: Series = df["fingerprint_key"].map(hash)
+        previous: Series = key_hashes.map(self._key_occurrences).fillna(0).astype(int)
+
+        seen_before: Series = previous > 0
+        if seen_before.any():
+            occurrences: Series = df.loc[seen_before, "fingerprint_occurrence"] + previous[seen_before]
+            df.loc[seen_before, "fingerprint"] = [fingerprint(key, occurrence) for key, occurrence in zip(df.loc[seen_before, "fingerprint_key"], occurrences)]
 
-        return counterparts_map
+        for key_hash, count in key_hashes.value_counts().items():
+            self._key_occurrences[key_hash] = self._key_occurrences.get(key_hash, 0) + count
 
+    def _export_counterparts(self, counterparts: list[str], db: Session, owner_id: int) -> dict[str, CounterpartSchema]:
+        """
+        Export all counterparts to the database, using one bulk upsert per call.
+        """
+        return self.counterpart_service.upsert_counterparts(names=set(counterparts), db=db, owner_id=owner_id)
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from uuid import uuid4
+from database.database import SessionLocal
+from models.account import Account
+from models.transaction_import import ImportJob, ImportStatus, ImportSummary
+from .csv_handler import CSV_handler
+from utils.logging import setup_loggers
+import os
+
+logger = setup_loggers()
+
+# Imports running at the same time, the others wait in the queue
+MAX_IMPORT_WORKERS: int = 2
+# Finished jobs that are kept for polling, the oldest ones are dropped first
+MAX_FINISHED_JOBS: int = 100
+
+class ImportJobService():
+    """
+    Runs CSV imports in worker threads, each with its own database session,
+    so an upload does not block the event loop of the API.
+
+    Jobs are kept in memory: they can only be polled on the worker that accepted the upload.
+    """
+    # ======================================================================================================== #
+    #                                       SETUP FUNCTIONS
+    # ======================================================================================================== # 
+
+    def __init__(self, max_workers: int = MAX_IMPORT_WORKERS):
+        self.jobs: OrderedDict[str, ImportJob] = OrderedDict()
+        self.lock: Lock = Lock()
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="csv-import")
+
+    # ======================================================================================================== #
+    #                                       CREATE FUNCTIONS
+    # ======================================================================================================== # 
+
+    def submit_import(self, file_path: str, file_name: str, owner_account: Account) -> ImportJob:
+        """
+        Queue the import of a CSV file. The worker deletes the file when it is done.
+
+        Returns:
+            ImportJob: The queued job, poll get_job with its id for progress.
+        """
+        job: ImportJob = ImportJob(id=uuid4().hex, owner_id=owner_account.id, file_name=file_name, time_created=datetime.now())
+
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune_jobs()
+
+        self.executor.submit(self._run_import, job.id, file_path, owner_account)
+
+        return job.model_copy()
+
+    # ======================================================================================================== #
+    #                                       GET FUNCTIONS
+    # ======================================================================================================== # 
+
+    def get_job(self, job_id: str, owner_id: int) -> ImportJob | None:
+        """
+        Returns:
+            ImportJob | None: A copy of the job, or None when it does not exist or another account submitted it.
+        """
+        with self.lock:
+            job: ImportJob | None = self.jobs.get(job_id)
+            if job is None or job.owner_id != owner_id:
+                return None
+
+            return job.model_copy(deep=True)
+
+    # ======================================================================================================== #
+    #                                       HELPER FUNCTIONS
+    # ======================================================================================================== # 
+
+    def _run_import(self, job_id: str, file_path: str, owner_account: Account):
+        self._update_job(job_id, status=ImportStatus.RUNNING)
+        db = SessionLocal()
+
+        try:
+            with open(file_path, "rb") as f_in:
+                file_handler: CSV_handler = CSV_handler(file=f_in, on_progress=lambda summary: self._update_progress(job_id, summary))
+                summary: ImportSummary = file_handler.process_file(db=db, owner_account=owner_account)
+
+            db.commit()
+            self._update_progress(job_id, summary)
+            self._update_job(job_id, status=ImportStatus.COMPLETED, time_finished=datetime.now())
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Import job {job_id} failed: {e}")
+            error: str = getattr(e, "msg", None) or str(e)
+            with self.lock:
+                self.jobs[job_id].errors.append(error)
+            self._update_job(job_id, status=ImportStatus.FAILED, time_finished=datetime.now())
+
+        finally:
+            db.close()
+            os.remove(file_path)
+
+    def _update_progress(self, job_id: str, summary: ImportSummary):
+        self._update_job(job_id, **summary.model_dump())
+
+    def _update_job(self, job_id: str, **values):
+        with self.lock:
+            job: ImportJob = self.jobs[job_id]
+            for field, value in values.items():
+                setattr(job, field, value)
+
+    def _prune_jobs(self):
+        finished: list[str] = [job.id for job in self.jobs.values() if job.status in (ImportStatus.COMPLETED, ImportStatus.FAILED)]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
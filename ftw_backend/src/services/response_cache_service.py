@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session  # type: ignore
+from cache import CacheBackend, response_cache
+from models.cache import CacheStats
+from .account_service import AccountService
+from typing import Any, Callable, TypeVar
+from utils.logging import setup_loggers
+import json
+
+logger = setup_loggers()
+
+T = TypeVar("T")
+
+class ResponseCacheService():
+    """
+    Caches the results of read endpoints per account and parameters.
+
+    Keys contain the data version of the account, which every write increments in the same database
+    transaction (AccountService.bump_data_version). A result cached before a write is never returned
+    after it, also not by other workers sharing the backend. bump_data_version additionally drops
+    the entries of the account, so they do not wait for the TTL.
+    """
+    # ======================================================================================================== #
+    #                                       SETUP FUNCTIONS
+    # ======================================================================================================== #
+
+    def __init__(self, backend: CacheBackend = response_cache):
+        self.backend: CacheBackend = backend
+        self.account_service: AccountService = AccountService()
+
+    # ======================================================================================================== #
+    #                                       GET FUNCTIONS
+    # ======================================================================================================== #
+
+    def get_or_build(self, db: Session, namespace: str, account_id: int, params: dict[str, Any], build: Callable[[], T]) -> T:
+        """
+        Return the cached result of namespace for the account and params, or build and cache it.
+
+        Args:
+            namespace (str): Name of the cached read, e.g. the endpoint.
+            params (dict[str, Any]): The parameters the result depends on, besides the account.
+            build (Callable[[], T]): Computes the result on a miss. The result must be picklable
+                and is shared between requests, so it should not be modified afterwards.
+        """
+        data_version: int | None = self.account_service.get_data_version(account_id=account_id, db=db)
+        if data_version is None:
+            return build()
+
+        key: str = f"{namespace}:{account_id}:{data_version}:{json.dumps(params, sort_keys=True, default=str)}"
+        found, value = self.backend.get(key)
+        if found:
+            return value
+
+        value = build()
+        self.backend.set(key, account_id, value)
+
+        return value
+
+    def get_stats(self) -> CacheStats:
+        return self.backend.get_stats()
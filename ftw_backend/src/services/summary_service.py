@@ -0,0 +1,231 @@
+from sqlalchemy.orm import Session  # type: ignore
+from sqlalchemy import Integer, Select, and_, cast, delete, extract, func, insert, or_, select
+from sqlalchemy.sql.elements import ColumnElement
+from database.schemas import AccountSchema, MonthlySummarySchema, TransactionSchema, CategorySchema, CategoryTypeSchema
+from datetime import date
+from typing import Iterable, NamedTuple
+from utils.logging import setup_loggers
+
+logger = setup_loggers()
+
+class SummaryMonth(NamedTuple):
+    account_id: int
+    year: int
+    month: int
+
+class SummaryService():
+    """
+    Maintains MonthlySummarySchema: the count and sum (in cents) of transactions per (account_id, year, month, category_id).
+
+    Every change to transactions refreshes the summary rows of the months it touched, by recomputing
+    those months from the transactions table. Call the refresh functions after the change is flushed,
+    and collect the months of deleted or moved transactions before the change.
+
+    A refresh locks the rows of its accounts until the transaction ends. Two writers on the same
+    account (e.g. two import workers, or an edit during an import) refresh one after the other, and the
+    second one recomputes from the transactions the first committed instead of inserting duplicate aggregates.
+    """
+    # ======================================================================================================== #
+    #                                       GET FUNCTIONS
+    # ======================================================================================================== #
+
+    def get_totals_per_category_type(self, db: Session, account_id: int, year: int | None = None, month: int | None = None) -> dict[str, int]:
+        """
+        Sum in cents of the categorized transactions per category type name, optionally of one year or month.
+        """
+        query: Select = (
+            select(CategoryTypeSchema.name, func.sum(MonthlySummarySchema.total_cents))
+            .select_from(MonthlySummarySchema)
+            .join(CategorySchema, MonthlySummarySchema.category_id == CategorySchema.id)
+            .join(CategoryTypeSchema, CategorySchema.category_type_id == CategoryTypeSchema.id)
+            .where(MonthlySummarySchema.account_id == account_id, *self._period_criteria(year, month))
+            .group_by(CategoryTypeSchema.name)
+        )
+
+        return {category_type_name: int(total) for category_type_name, total in db.execute(query)}
+
+    def get_totals_per_category(self, db: Session, account_id: int, type_name: str, year: int | None = None, month: int | None = None) -> list[tuple[str, int, bool]]:
+        """
+        Sum per category of one category type (0 for categories without transactions), optionally of one year or month.
+
+        Returns:
+            list[tuple[str, int, bool]]: The category name, its sum in cents and whether its type is positive.
+        """
+        query: Select = (
+            select(CategorySchema.name, func.coalesce(func.sum(MonthlySummarySchema.total_cents), 0), CategoryTypeSchema.is_positive)
+            .select_from(CategorySchema)
+            .join(CategoryTypeSchema, CategorySchema.category_type_id == CategoryTypeSchema.id)
+            .outerjoin(MonthlySummarySchema, and_(
+                MonthlySummarySchema.category_id == CategorySchema.id,
+                MonthlySummarySchema.account_id == account_id,
+                *self._period_criteria(year, month),
+            ))
+            .where(CategoryTypeSchema.name == type_name, CategorySchema.owner_id == account_id)
+            .group_by(CategorySchema.id, CategorySchema.name, CategoryTypeSchema.is_positive)
+        )
+
+        return [(name, int(total), is_positive) for name, total, is_positive in db.execute(query)]
+
+    def get_totals_per_month_and_type(self, db: Session, account_id: int, year: int) -> list[tuple[int, str, int]]:
+        """
+        Sum in cents of the categorized transactions per month and category type name of one year.
+        """
+        query: Select = (
+            select(MonthlySummarySchema.month, CategoryTypeSchema.name, func.sum(MonthlySummarySchema.total_cents))
+            .select_from(MonthlySummarySchema)
+            .join(CategorySchema, MonthlySummarySchema.category_id == CategorySchema.id)
+            .join(CategoryTypeSchema, CategorySchema.category_type_id == CategoryTypeSchema.id)
+            .where(MonthlySummarySchema.account_id == account_id, MonthlySummarySchema.year == year)
+            .group_by(MonthlySummarySchema.month, CategoryTypeSchema.name)
+        )
+
+        return [(month, name, int(total)) for month, name, total in db.execute(query)]
+
+    # ======================================================================================================== #
+    #                                       UPDATE FUNCTIONS
+    # ======================================================================================================== #
+
+    def get_months_of_transactions(self, db: Session, *criteria: ColumnElement) -> set[SummaryMonth]:
+        """
+        The summary months of the transactions matching the criteria.
+        """
+        year, month = self._year_month_columns()
+        query: Select = select(TransactionSchema.account_id, year, month).where(*criteria).distinct()
+
+        return {SummaryMonth(*row) for row in db.execute(query)}
+
+    def refresh_months(self, db: Session, months: Iterable[SummaryMonth]):
+        """
+        Recompute the summary rows of the given months from the transactions, with one DELETE and one INSERT ... SELECT.
+        """
+        months = set(months)
+        if not months:
+            return
+
+        self._lock_accounts(db, {m.account_id for m in months})
+        db.execute(delete(MonthlySummarySchema).where(or_(*(
+            and_(MonthlySummarySchema.account_id == m.account_id, MonthlySummarySchema.year == m.year, MonthlySummarySchema.month == m.month)
+            for m in months
+        ))))
+        # Date ranges, so the (account_id, date_executed) index selects the transactions
+        self._insert_aggregates(db, or_(*(
+            and_(TransactionSchema.account_id == m.account_id, TransactionSchema.date_executed >= start, TransactionSchema.date_executed < end)
+            for m in months
+            for start, end in [self._get_month_bounds(m.year, m.month)]
+        )))
+
+        logger.debug(f"Refreshed {len(months)} summary months")
+
+    def refresh_months_of_transactions(self, db: Session, *criteria: ColumnElement):
+        """
+        Refresh the summary months of the transactions matching the criteria (e.g. after they were inserted or recategorized).
+        """
+        self.refresh_months(db, self.get_months_of_transactions(db, *criteria))
+
+    def rebuild(self, db: Session, account_id: int | None = None):
+        """
+        Recompute all summary rows, of one account or of all accounts.
+        """
+        account_criteria: list[ColumnElement] = [] if account_id is None else [MonthlySummarySchema.account_id == account_id]
+        if account_id is not None:
+            self._lock_accounts(db, {account_id})
+        db.execute(delete(MonthlySummarySchema).where(*account_criteria))
+
+        self._insert_aggregates(db, *([] if account_id is None else [TransactionSchema.account_id == account_id]))
+
+    def rebuild_if_empty(self, db: Session):
+        """
+        Fill the summary table of a database that has transactions, but no summaries yet (e.g. right after the table was (re)created).
+        """
+        has_summaries: bool = db.execute(select(MonthlySummarySchema.id).limit(1)).first() is not None
+        has_transactions: bool = db.execute(select(TransactionSchema.id).limit(1)).first() is not None
+
+        if has_transactions and not has_summaries:
+            logger.info("Building the monthly summaries")
+            self.rebuild(db)
+
+    # ======================================================================================================== #
+    #                                       CHECK FUNCTIONS
+    # ======================================================================================================== #
+
+    def find_inconsistencies(self, db: Session, account_id: int | None = None) -> list[str]:
+        """
+        Compare the summary rows with the sums computed from the transactions.
+
+        Returns:
+            list[str]: A description of every summary row that is missing, stale or superfluous.
+        """
+        summaries: dict[tuple, tuple[int, int]] = {
+            (row.account_id, row.year, row.month, row.category_id): (row.n_transactions, row.total_cents)
+            for row in db.execute(select(MonthlySummarySchema).where(
+                *([] if account_id is None else [MonthlySummarySchema.account_id == account_id])
+            )).scalars()
+        }
+        aggregates: dict[tuple, tuple[int, int]] = {
+            (row.account_id, row.year, row.month, row.category_id): (row.n_transactions, row.total_cents)
+            for row in db.execute(self._aggregate_query(
+                *([] if account_id is None else [TransactionSchema.account_id == account_id])
+            ))
+        }
+
+        inconsistencies: list[str] = []
+        for key in sorted(summaries.keys() | aggregates.keys(), key=str):
+            expected, stored = aggregates.get(key), summaries.get(key)
+            if expected is None:
+                inconsistencies.append(f"{key}: summary {stored} has no transactions")
+            elif stored is None:
+                inconsistencies.append(f"{key}: summary missing, expected {expected}")
+            elif stored != expected:
+                inconsistencies.append(f"{key}: summary {stored}, expected {expected}")
+
+        return inconsistencies
+
+    # ======================================================================================================== #
+    #                                       HELPER FUNCTIONS
+    # ======================================================================================================== #
+
+    def _lock_accounts(self, db: Session, account_ids: set[int]):
+        """
+        SELECT ... FOR UPDATE the accounts, in id order so concurrent refreshes cannot deadlock.
+        SQLite has no row locks, but it only allows one writing transaction at a time anyway.
+        """
+        db.execute(select(AccountSchema.id).where(AccountSchema.id.in_(account_ids)).order_by(AccountSchema.id).with_for_update()).all()
+
+    def _year_month_columns(self) -> tuple[ColumnElement, ColumnElement]:
+        return (
+            cast(extract("year", TransactionSchema.date_executed), Integer).label("year"),
+            cast(extract("month", TransactionSchema.date_executed), Integer).label("month"),
+        )
+
+    def _aggregate_query(self, *criteria: ColumnElement) -> Select:
+        year, month = self._year_month_columns()
+
+        return (
+            select(
+                TransactionSchema.account_id,
+                year,
+                month,
+                TransactionSchema.category_id,
+                func.count(TransactionSchema.id).label("n_transactions"),
+                func.coalesce(func.sum(TransactionSchema.value_cents), 0).label("total_cents"),
+            )
+            .where(TransactionSchema.account_id.is_not(None), TransactionSchema.date_executed.is_not(None), *criteria)
+            .group_by(TransactionSchema.account_id, year, month, TransactionSchema.category_id)
+        )
+
+    def _insert_aggregates(self, db: Session, *criteria: ColumnElement):
+        columns: list[str] = ["account_id", "year", "month", "category_id", "n_transactions", "total_cents"]
+        db.execute(insert(MonthlySummarySchema).from_select(columns, self._aggregate_query(*criteria)))
+
+    def _period_criteria(self, year: int | None, month: int | None) -> list[ColumnElement]:
+        criteria: list[ColumnElement] = []
+        if year is not None:
+            criteria.append(MonthlySummarySchema.year == year)
+        if month is not None and month != 0:
+            criteria.append(MonthlySummarySchema.month == month)
+
+        return criteria
+
+    def _get_month_bounds(self, year: int, month: int) -> tuple[date, date]:
+        end: date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return date(year, month, 1), end
@@ -0,0 +1,133 @@
+from sqlalchemy.orm import Session  # type: ignore
+from sqlalchemy import Select, select
+from database.schemas import TransactionSchema, CategorySchema, CategoryTypeSchema, CounterpartSchema
+from models.transaction import ExportFormat
+from datetime import date
+from typing import Iterator
+from utils.logging import setup_loggers
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+logger = setup_loggers()
+
+# Rows fetched per round trip and written per record batch (a Parquet row group)
+EXPORT_BATCH_SIZE: int = 50_000
+# Compression of both formats, pyarrow, pandas and polars read it transparently
+EXPORT_COMPRESSION: str = "zstd"
+
+# Exportable columns: the selected expression and its Arrow type, in the default column order
+EXPORT_COLUMNS: dict[str, tuple] = {
+    "id": (TransactionSchema.id, pa.int64()),
+    "date_executed": (TransactionSchema.date_executed, pa.date32()),
+    "value": (TransactionSchema.value, pa.decimal128(12, 2)),
+    "value_cents": (TransactionSchema.value_cents, pa.int64()),
+    "description": (TransactionSchema.description, pa.string()),
+    "owner_iban": (TransactionSchema.owner_iban, pa.string()),
+    "counterpart_id": (CounterpartSchema.id, pa.int64()),
+    "counterpart_name": (CounterpartSchema.name, pa.string()),
+    "category_id": (CategorySchema.id, pa.int64()),
+    "category_name": (CategorySchema.name, pa.string()),
+    "category_type_name": (CategoryTypeSchema.name, pa.string()),
+}
+
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+class TransactionExportService():
+    """
+    Exports the transactions of an account in a columnar format (Parquet or an Arrow IPC stream),
+    joined with their category, category type and counterpart names.
+
+    Rows are read from the database cursor EXPORT_BATCH_SIZE at a time (a server-side cursor on PostgreSQL),
+    converted to Arrow record batches and written right away, so an export never holds the whole account in memory.
+    """
+    # ======================================================================================================== #
+    #                                       GET FUNCTIONS
+    # ======================================================================================================== #
+
+    def get_schema(self, columns: list[str]) -> pa.Schema:
+        return pa.schema([(column, EXPORT_COLUMNS[column][1]) for column in columns])
+
+    def stream_record_batches(self, db: Session, account_id: int, columns: list[str], start: date | None = None, end: date | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Iterate the transactions of an account as record batches with the given columns, oldest first.
+
+        Args:
+            columns (list[str]): Names of EXPORT_COLUMNS.
+            start (date | None): First day to export, inclusive.
+            end (date | None): Last day to export, inclusive.
+        """
+        schema: pa.Schema = self.get_schema(columns)
+        query: Select = (
+            select(*[EXPORT_COLUMNS[column][0].label(column) for column in columns])
+            .select_from(TransactionSchema)
+            .outerjoin(CategorySchema, TransactionSchema.category_id == CategorySchema.id)
+            .outerjoin(CategoryTypeSchema, CategorySchema.category_type_id == CategoryTypeSchema.id)
+            .outerjoin(CounterpartSchema, TransactionSchema.counterpart_id == CounterpartSchema.id)
+            .where(TransactionSchema.account_id == account_id)
+            .order_by(TransactionSchema.date_executed, TransactionSchema.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if start is not None:
+            query = query.where(TransactionSchema.date_executed >= start)
+        if end is not None:
+            query = query.where(TransactionSchema.date_executed <= end)
+
+        # Executed on the connection: Core rows, without the per-row overhead of the ORM result
+        for rows in db.connection().execute(query).partitions():
+            # Transpose the row tuples into one Python list per column, Arrow converts each in one call
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+                schema=schema,
+            )
+
+    def stream_export(self, db: Session, account_id: int, export_format: ExportFormat, columns: list[str], start: date | None = None, end: date | None = None) -> Iterator[bytes]:
+        """
+        Iterate the bytes of the export file, one chunk per record batch. An account without
+        (matching) transactions gives a valid file without rows.
+        """
+        sink: _ChunkSink = _ChunkSink()
+        schema: pa.Schema = self.get_schema(columns)
+
+        if export_format == ExportFormat.PARQUET:
+            writer = pq.ParquetWriter(sink, schema, compression=EXPORT_COMPRESSION)
+        else:
+            writer = pa_ipc.new_stream(sink, schema, options=pa_ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION))
+
+        n_rows: int = 0
+        with writer:
+            for batch in self.stream_record_batches(db, account_id=account_id, columns=columns, start=start, end=end):
+                writer.write_batch(batch)
+                n_rows += batch.num_rows
+                yield sink.take()
+
+        # Closing the writer writes the Parquet footer or the end of the IPC stream
+        yield sink.take()
+        logger.info(f"Exported {n_rows} transactions of account {account_id} as {export_format}")
+
+class _ChunkSink():
+    """
+    Write-only file object collecting what a writer wrote since the last take().
+    pyarrow keeps track of the file position itself, so the written bytes can be handed out and dropped.
+    """
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.closed: bool = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data: bytes = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
@@ -1,17 +1,36 @@
-from sqlalchemy.orm import Session, joinedload # type: ignore
-from models.transaction import Transaction, TransactionCreate, TransactionEdit
-from database.schemas import TransactionSchema, AccountSchema, CategorySchema, CategoryTypeSchema
+from sqlalchemy.orm import Query, Session, joinedload # type: ignore
+from models.transaction import Transaction, TransactionCreate, TransactionEdit, TransactionPatch, TransactionStats, TransactionTableView, SortOrder
+from database.schemas import TransactionSchema, AccountSchema, CategorySchema, CategoryTypeSchema, CounterpartSchema
+from database.dialect import dialect_insert
+from database.search import SEARCH_CONFIG, SEARCH_TABLE, description_search_vector, search_table
 from .account_service import AccountService
 from .category_service import CategoryService
+from .summary_service import SummaryMonth, SummaryService
 from utils.logging import setup_loggers
+from utils.money import from_cents, to_cents
+from sqlalchemy import Select, case, extract, func, literal_column, or_, select, text, update
+from exceptions.exceptions import CategoryNotFoundException, CounterpartNotFoundException, FormattingException, TransactionNotFoundException
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from typing import Iterator
+import csv
+import re
 
 logger = setup_loggers()
 
+# Temporary table the PostgreSQL bulk insert COPYs into
+COPY_STAGING_TABLE: str = "transactions_import_staging"
+# Rows fetched per round trip when streaming transactions
+STREAM_BATCH_SIZE: int = 2_000
+
 
 class TransactionService:
     def __init__(self):
         self.account_service: AccountService = AccountService()
         self.category_service: CategoryService = CategoryService()
+        self.summary_service: SummaryService = SummaryService()
     # ======================================================================================================== #
     #                                       CREATE FUNCTIONS
     # ======================================================================================================== #
@@ -26,52 +45,197 @@ class TransactionService:
         Returns:
             Transaction: The added transaction as a Pydantic model.
         """
-        new_transaction_schemas: list[TransactionSchema] = [self.convert_transaction_data(TransactionSchema(), transaction, db=db, active_account=active_account) for transaction in new_transactions]
+        new_transaction_schemas: list[TransactionSchema] = [self.convert_transaction_data(TransactionSchema(account_id=active_account.id), transaction, db=db, active_account=active_account) for transaction in new_transactions]
         db.add_all(new_transaction_schemas)
+        db.flush()
+
+        self.summary_service.refresh_months(db, self._get_summary_months(new_transaction_schemas))
+        self.account_service.bump_data_version([active_account.id], db=db)
 
         return new_transaction_schemas
 
+    def add_transaction_records(self, records: list[dict], db: Session) -> list[int]:
+        """
+        Bulk insert already converted transaction records (e.g. from a CSV import) without building
+        ORM objects. PostgreSQL loads them with COPY FROM STDIN, SQLite with an executemany INSERT.
+        Records whose fingerprint is already stored are skipped (ON CONFLICT DO NOTHING).
+        Single transactions are still added and edited through the ORM (add_transactions).
+
+        Args:
+            records (list[dict]): Column name -> value mappings for TransactionSchema.
+            db (Session): The SQLAlchemy database session.
+
+        Returns:
+            list[int]: The ids of the newly inserted transactions.
+        """
+        if not records:
+            return []
+
+        if db.get_bind().dialect.name == "postgresql":
+            return self._copy_transaction_records(records=records, db=db)
+
+        # SQLite (local runs and benchmarks): one executemany INSERT with RETURNING
+        stmt = dialect_insert(db, TransactionSchema).on_conflict_do_nothing(index_elements=["fingerprint"])
+        return db.scalars(stmt.returning(TransactionSchema.id), records).all()
+
     # ======================================================================================================== #
     #                                       GET FUNCTIONS
     # ======================================================================================================== #
 
-    def get_all_transactions(self, db: Session, iban: str = "", as_schema: bool = False, year: int | None = None, month: int | None = None) -> list[Transaction]:
-        iban = self.account_service.format_IBAN(iban)
-        
-    
-        transactions = (
+    def get_all_transactions(self, db: Session, account_id: int, as_schema: bool = False, year: int | None = None, month: int | None = None) -> list[Transaction]:
+        query = (
         db.query(TransactionSchema)
-        .filter(TransactionSchema.owner_iban == iban)
+        .filter(TransactionSchema.account_id == account_id)
         .options(joinedload(TransactionSchema.category).joinedload(CategorySchema.category_type),joinedload(TransactionSchema.counterpart))
-        .all()
         )
 
-        if year is not None:
-            transactions = [transaction for transaction in transactions if transaction.date_executed.year == year]
-
-        if month is not None and month != 0:
-            transactions = [transaction for transaction in transactions if transaction.date_executed.month == month]
+        transactions = self._filter_period(query, year=year, month=month).all()
 
         if as_schema:
             return transactions
         else:
             return [Transaction.model_validate(transaction) for transaction in transactions]
 
-    def get_transaction(self, transaction_id: int, db: Session, iban: str = "", as_schema: bool = False) -> Transaction:
+    def get_transaction_table_views(self, db: Session, account_id: int, year: int | None = None, month: int | None = None, transaction_ids: list[int] | None = None) -> list[TransactionTableView]:
+        """
+        Retrieve the transactions of an account as TransactionTableView, filtered on a period like get_all_transactions
+        and optionally on their ids.
+        """
+        query: Select = self._filter_period(self._get_table_view_query(account_id), year=year, month=month)
+        if transaction_ids is not None:
+            query = query.where(TransactionSchema.id.in_(transaction_ids))
+
+        return [TransactionTableView.from_row(row) for row in db.execute(query)]
+
+    def stream_transaction_table_views(self, db: Session, account_id: int, year: int | None = None, month: int | None = None) -> Iterator[list[TransactionTableView]]:
+        """
+        Iterate the transactions of an account as batches of TransactionTableView, newest first.
+        The rows are fetched STREAM_BATCH_SIZE at a time (a server-side cursor on PostgreSQL),
+        so memory usage does not grow with the number of transactions.
+        """
+        query: Select = (
+            self._filter_period(self._get_table_view_query(account_id), year=year, month=month)
+            .order_by(TransactionSchema.date_executed.desc(), TransactionSchema.id.desc())
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+
+        for rows in db.execute(query).partitions():
+            yield [TransactionTableView.from_row(row) for row in rows]
+
+    def get_transaction_page(self, db: Session, account_id: int, limit: int, cursor: str | None = None, order: SortOrder = SortOrder.DESC, year: int | None = None, month: int | None = None) -> tuple[list[TransactionTableView], str | None]:
+        """
+        Retrieve one page of transactions as TransactionTableView, sorted on (date_executed, id).
+
+        Keyset pagination: the cursor holds the sort key of the last transaction of the previous page and the
+        query continues right after it, so every page costs the same instead of skipping OFFSET rows.
+
+        Args:
+            limit (int): The page size.
+            cursor (str | None): The next_cursor of the previous page, None for the first page.
+            order (SortOrder): Newest (desc) or oldest (asc) transactions first.
+
+        Returns:
+            tuple[list[TransactionTableView], str | None]: The transactions of the page and the cursor of the next page (None on the last page).
+        """
+        query: Select = self._filter_period(self._get_table_view_query(account_id), year=year, month=month)
+
+        if cursor is not None:
+            cursor_date, cursor_id = self._decode_cursor(cursor)
+            # (date_executed, id) after the cursor, written out so date_executed stays an index range
+            if order == SortOrder.DESC:
+                query = query.where(
+                    TransactionSchema.date_executed <= cursor_date,
+                    or_(TransactionSchema.date_executed < cursor_date, TransactionSchema.id < cursor_id),
+                )
+            else:
+                query = query.where(
+                    TransactionSchema.date_executed >= cursor_date,
+                    or_(TransactionSchema.date_executed > cursor_date, TransactionSchema.id > cursor_id),
+                )
+
+        if order == SortOrder.DESC:
+            query = query.order_by(TransactionSchema.date_executed.desc(), TransactionSchema.id.desc())
+        else:
+            query = query.order_by(TransactionSchema.date_executed.asc(), TransactionSchema.id.asc())
+
+        # One extra row tells if there is a next page
+        transactions: list[TransactionTableView] = [TransactionTableView.from_row(row) for row in db.execute(query.limit(limit + 1))]
+        if len(transactions) <= limit:
+            return transactions, None
+
+        transactions = transactions[:limit]
+        return transactions, self._encode_cursor(transactions[-1])
+
+    def get_transaction_stats(self, db: Session, account_id: int) -> TransactionStats:
+        """
+        Count the transactions of an account in one aggregate query, for the info tiles next to the paged table.
+        """
+        year_start: date = date(date.today().year, 1, 1)
+
+        n_transactions, n_this_year, n_unprocessed, last_date_executed = db.execute(
+            select(
+                func.count(TransactionSchema.id),
+                func.count(case((TransactionSchema.date_executed >= year_start, 1))),
+                func.count(case((TransactionSchema.category_id.is_(None), 1))),
+                func.max(TransactionSchema.date_executed),
+            ).where(TransactionSchema.account_id == account_id)
+        ).one()
+
+        return TransactionStats(
+            n_transactions=n_transactions,
+            n_transactions_this_year=n_this_year,
+            n_unprocessed=n_unprocessed,
+            last_date_executed=last_date_executed,
+        )
+
+    def search_transactions(self, db: Session, account_id: int, search_text: str, limit: int, offset: int = 0) -> tuple[list[TransactionTableView], int | None]:
+        """
+        Full-text search over the descriptions and counterpart names of the transactions of an account.
+        Every word of the search text has to match, the last one can be the start of a word (search as you type).
+        All matches are ranked, best matches first (ties newest first), and paged with an offset into that order.
+
+        PostgreSQL uses the GIN index on the description tsvector and the trigram index on counterpart
+        names, SQLite the FTS5 table of database.search.
+
+        Args:
+            search_text (str): The text typed by the user.
+            limit (int): The page size.
+            offset (int): The number of results to skip (the next_offset of the previous page).
+
+        Returns:
+            tuple[list[TransactionTableView], int | None]: The transactions of the page and the offset of the next page (None on the last page).
+        """
+        terms: list[str] = re.findall(r"\w+", search_text.lower())
+        if not terms:
+            return [], None
+
+        if db.get_bind().dialect.name == "postgresql":
+            query: Select = self._search_postgresql(db, account_id=account_id, search_text=search_text, terms=terms)
+        else:
+            query = self._search_sqlite(account_id=account_id, terms=terms)
+
+        # One extra row tells if there is a next page
+        transactions: list[TransactionTableView] = [TransactionTableView.from_row(row) for row in db.execute(query.offset(offset).limit(limit + 1))]
+        if len(transactions) <= limit:
+            return transactions, None
+
+        return transactions[:limit], offset + limit
+
+    def get_transaction(self, transaction_id: int, db: Session, account_id: int, as_schema: bool = False) -> Transaction:
         """
         Retrieve a transaction as a Pydantic model by its ID.
 
         Args:
             transaction_id (int): The ID of the transaction.
             db (Session): The SQLAlchemy database session.
+            account_id (int): The account that owns the transaction.
 
         Returns:
             Transaction: The transaction as a Pydantic model.
         """
-        iban = self.account_service.format_IBAN(iban)
         transaction_schema = (
         db.query(TransactionSchema)
-        .filter(TransactionSchema.owner_iban == iban)
+        .filter(TransactionSchema.account_id == account_id)
         .filter(TransactionSchema.id == transaction_id)
         .options(joinedload(TransactionSchema.category))
         .first()
@@ -89,10 +253,75 @@ class TransactionService:
     #                                       UPDATE FUNCTIONS
     # ======================================================================================================== #
     def update_transaction(self,current_transaction: TransactionSchema, updated_transaction: TransactionSchema, db: Session, active_account: AccountSchema) -> TransactionSchema:
+        # The transaction can move to another month, so refresh the old and the new one
+        summary_months: set[SummaryMonth] = self._get_summary_months([current_transaction])
         updated_transaction: TransactionSchema = self.convert_transaction_data(current_transaction=current_transaction, updated_transaction=updated_transaction, db=db, active_account=active_account)
+        db.flush()
+
+        self.summary_service.refresh_months(db, summary_months | self._get_summary_months([updated_transaction]))
+        self.account_service.bump_data_version([active_account.id], db=db)
 
         return updated_transaction
 
+    def patch_transactions(self, patches: list[TransactionPatch], db: Session, active_account: AccountSchema) -> list[int]:
+        """
+        Apply a batch of partial edits to transactions of the active account, without loading them as ORM objects.
+        Transactions with the same changes are updated together in one UPDATE statement.
+
+        Args:
+            patches (list[TransactionPatch]): The id and changed fields per transaction. Later patches of the
+                same transaction override the fields of earlier ones.
+            db (Session): The SQLAlchemy database session.
+            active_account (AccountSchema): The account that has to own the transactions, categories and counterparts.
+
+        Returns:
+            list[int]: The ids of the patched transactions.
+        """
+        changes_per_id: dict[int, dict] = {}
+        for patch in patches:
+            changes_per_id.setdefault(patch.id, {}).update(patch.changes.model_dump(include=patch.changes.model_fields_set))
+
+        if not changes_per_id:
+            return []
+
+        # Ownership of all transactions in one query, with their current date for the summaries
+        owned_dates: dict[int, date | None] = dict(db.execute(
+            select(TransactionSchema.id, TransactionSchema.date_executed)
+            .where(TransactionSchema.id.in_(changes_per_id), TransactionSchema.account_id == active_account.id)
+        ).all())
+        missing_ids: set[int] = changes_per_id.keys() - owned_dates.keys()
+        if missing_ids:
+            raise TransactionNotFoundException(sorted(missing_ids))
+
+        self._check_patch_references(list(changes_per_id.values()), db=db, owner_id=active_account.id)
+
+        # One UPDATE per distinct set of changes
+        grouped_ids: dict[tuple, list[int]] = {}
+        for transaction_id, changes in changes_per_id.items():
+            grouped_ids.setdefault(tuple(sorted(changes.items())), []).append(transaction_id)
+
+        for changes, transaction_ids in grouped_ids.items():
+            if not changes:
+                continue
+
+            db.execute(
+                update(TransactionSchema)
+                .where(TransactionSchema.id.in_(transaction_ids))
+                .values(dict(changes))
+                .execution_options(synchronize_session=False)
+            )
+        logger.debug(f"Patched {len(changes_per_id)} transactions with {len(grouped_ids)} UPDATE statements")
+
+        # The months the transactions were in and the months they moved to
+        new_dates: list[date | None] = [changes["date_executed"] for changes in changes_per_id.values() if "date_executed" in changes]
+        self.summary_service.refresh_months(db, {
+            SummaryMonth(active_account.id, date_executed.year, date_executed.month)
+            for date_executed in [*owned_dates.values(), *new_dates] if date_executed is not None
+        })
+        self.account_service.bump_data_version([active_account.id], db=db)
+
+        return list(changes_per_id)
+
     def convert_transaction_data(self, current_transaction: Transaction | TransactionSchema, updated_transaction: TransactionEdit | TransactionCreate, db: Session, active_account: AccountSchema) -> Transaction:
         """
         Update an existing transaction object with new data.
@@ -114,6 +343,9 @@ class TransactionService:
             # Convert values into right types
             setattr(current_transaction, field, value)
 
+        if hasattr(updated_transaction, "value"):
+            current_transaction.value_cents = to_cents(updated_transaction.value)
+
         if category_changed:
             if updated_transaction.category_id is not None:
                 category: CategorySchema = self.category_service.get_category(db=db, category_id=updated_transaction.category_id, as_schema=True, owner_id=active_account.id)
@@ -129,60 +361,227 @@ class TransactionService:
     #                                       DELETE FUNCTIONS
     # ======================================================================================================== # 
   
-    def delete_transaction(self, transaction_id: int, db: Session) -> Transaction | None:
+    def delete_transaction(self, transaction_id: int, db: Session, account_id: int) -> Transaction | None:
         """
         Delete a transaction by its ID.
 
         Args:
             transaction_id (int): The ID of the transaction to delete.
             db (Session): The SQLAlchemy database session.
+            account_id (int): The account that owns the transaction, transactions of other accounts are not found.
 
         Returns:
             Transaction | None: The deleted transaction as a Pydantic model, or None if not found.
         """
-        transaction_schema: TransactionSchema = self.get_transaction(transaction_id=transaction_id, db=db, as_schema=True)
+        transaction_schema: TransactionSchema | None = self.get_transaction(transaction_id=transaction_id, db=db, account_id=account_id, as_schema=True)
+        if transaction_schema is None:
+            raise TransactionNotFoundException(transaction_id)
+
+        summary_months: set[SummaryMonth] = self._get_summary_months([transaction_schema])
         db.delete(transaction_schema)
+        db.flush()
+
+        self.summary_service.refresh_months(db, summary_months)
+        self.account_service.bump_data_version([account_id], db=db)
         
-    def delete_multiple_transactions(self, transaction_ids: list[int], db: Session) -> None:
+    def delete_multiple_transactions(self, transaction_ids: list[int], db: Session, account_id: int) -> None:
         """
         Delete multiple transactions by their IDs.
 
         Args:
             transaction_ids (list[int]): The IDs of the transactions to delete.
             db (Session): The SQLAlchemy database session.
+            account_id (int): The account that owns the transactions, ids of other accounts are ignored.
 
         Returns:
             None
         """
-        db.query(TransactionSchema).filter(TransactionSchema.id.in_(transaction_ids)).delete(synchronize_session=False)
+        criteria = (TransactionSchema.id.in_(transaction_ids), TransactionSchema.account_id == account_id)
+        summary_months: set[SummaryMonth] = self.summary_service.get_months_of_transactions(db, *criteria)
+        n_deleted: int = db.query(TransactionSchema).filter(*criteria).delete(synchronize_session=False)
+
+        if n_deleted:
+            self.summary_service.refresh_months(db, summary_months)
+            self.account_service.bump_data_version([account_id], db=db)
        
         return None
     
     # ======================================================================================================== #
     #                                      HELPER FUNCTIONS
     # ======================================================================================================== # 
+
+    def _get_table_view_query(self, account_id: int) -> Select:
+        """
+        Select only the columns of TransactionTableView, with explicit joins instead of loading
+        the ORM objects of the transactions, their category (type) and counterpart.
+        """
+        return (
+            select(
+                TransactionSchema.id,
+                CategorySchema.id.label("category_id"),
+                CategorySchema.name.label("category_name"),
+                CategoryTypeSchema.name.label("category_type_name"),
+                CounterpartSchema.id.label("counterpart_id"),
+                CounterpartSchema.name.label("counterpart_name"),
+                TransactionSchema.owner_iban,
+                TransactionSchema.value,
+                TransactionSchema.date_executed,
+                TransactionSchema.description,
+            )
+            .select_from(TransactionSchema)
+            .outerjoin(CategorySchema, TransactionSchema.category_id == CategorySchema.id)
+            .outerjoin(CategoryTypeSchema, CategorySchema.category_type_id == CategoryTypeSchema.id)
+            .outerjoin(CounterpartSchema, TransactionSchema.counterpart_id == CounterpartSchema.id)
+            .where(TransactionSchema.account_id == account_id)
+        )
+
+    def _check_patch_references(self, changes: list[dict], db: Session, owner_id: int):
+        """
+        Check that the categories and counterparts the changes refer to belong to the owner, with one query each.
+        """
+        category_ids: set[int] = {c["category_id"] for c in changes if c.get("category_id") is not None}
+        if category_ids:
+            found_ids: set[int] = set(db.scalars(select(CategorySchema.id).where(CategorySchema.id.in_(category_ids), CategorySchema.owner_id == owner_id)))
+            if category_ids - found_ids:
+                raise CategoryNotFoundException(sorted(category_ids - found_ids))
+
+        counterpart_ids: set[int] = {c["counterpart_id"] for c in changes if c.get("counterpart_id") is not None}
+        if counterpart_ids:
+            found_ids = set(db.scalars(select(CounterpartSchema.id).where(CounterpartSchema.id.in_(counterpart_ids), CounterpartSchema.owner_id == owner_id)))
+            if counterpart_ids - found_ids:
+                raise CounterpartNotFoundException(sorted(counterpart_ids - found_ids))
+
+    def _get_summary_months(self, transactions: list[TransactionSchema]) -> set[SummaryMonth]:
+        return {
+            SummaryMonth(transaction.account_id, transaction.date_executed.year, transaction.date_executed.month)
+            for transaction in transactions if transaction.date_executed is not None
+        }
+
+    def _search_postgresql(self, db: Session, account_id: int, search_text: str, terms: list[str]) -> Select:
+        # Counterparts are few, fetch the matching ones first so both conditions stay on transactions
+        # and PostgreSQL can combine the description and counterpart_id indexes (BitmapOr)
+        pattern: str = "%" + re.sub(r"([\\%_])", r"\\\1", search_text.strip()) + "%"
+        counterpart_ids: list[int] = db.scalars(
+            select(CounterpartSchema.id).where(CounterpartSchema.owner_id == account_id, CounterpartSchema.name.ilike(pattern, escape="\\"))
+        ).all()
+
+        # Prefix match on the last word: "colruyt sup" -> colruyt & sup:*
+        ts_query = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+        search_vector = description_search_vector()
+        # Counterpart matches first, then by relevance of the description
+        rank = case((TransactionSchema.counterpart_id.in_(counterpart_ids), 1.0), else_=0.0) + func.coalesce(func.ts_rank(search_vector, ts_query), 0.0)
+
+        candidates = (
+            select(TransactionSchema.id, rank.label("rank"))
+            .where(
+                TransactionSchema.account_id == account_id,
+                or_(search_vector.op("@@")(ts_query), TransactionSchema.counterpart_id.in_(counterpart_ids)),
+            )
+            .subquery()
+        )
+
+        return (
+            self._get_table_view_query(account_id)
+            .join(candidates, candidates.c.id == TransactionSchema.id)
+            .order_by(candidates.c.rank.desc(), TransactionSchema.date_executed.desc(), TransactionSchema.id.desc())
+        )
+
+    def _search_sqlite(self, account_id: int, terms: list[str]) -> Select:
+        # FTS5 query with a prefix match on the last word: "colruyt sup" -> "colruyt" "sup"*
+        match: str = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+        # Every match of the account gets its bm25 rank
+        candidates = (
+            select(search_table.c.rowid.label("id"), search_table.c.rank.label("rank"))
+            .join(TransactionSchema, TransactionSchema.id == search_table.c.rowid)
+            .where(literal_column(SEARCH_TABLE).op("MATCH")(match), TransactionSchema.account_id == account_id)
+            .subquery()
+        )
+
+        return (
+            self._get_table_view_query(account_id)
+            .join(candidates, candidates.c.id == TransactionSchema.id)
+            # FTS5 rank is the bm25 score, lower is better
+            .order_by(candidates.c.rank, TransactionSchema.date_executed.desc(), TransactionSchema.id.desc())
+        )
+
+    def _filter_period(self, query: Query | Select, year: int | None = None, month: int | None = None) -> Query | Select:
+        if year is not None:
+            # Date range instead of extracting the year/month, so (account_id, date_executed) is used as index range
+            start, end = self._get_period_bounds(year=year, month=month)
+            query = query.filter(TransactionSchema.date_executed >= start, TransactionSchema.date_executed < end)
+        elif month is not None and month != 0:
+            # The same month of every year, this cannot use the date index
+            query = query.filter(extract("month", TransactionSchema.date_executed) == month)
+
+        return query
+
+    def _encode_cursor(self, transaction: TransactionTableView) -> str:
+        key: str = f"{transaction.date_executed.isoformat()}|{transaction.id}"
+        return urlsafe_b64encode(key.encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple[date, int]:
+        try:
+            cursor_date, cursor_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return date.fromisoformat(cursor_date), int(cursor_id)
+        except ValueError:
+            raise FormattingException("cursor", cursor)
+
+    def _get_period_bounds(self, year: int, month: int | None = None) -> tuple[date, date]:
+        """
+        Return the half-open date range [start, end) of a year, or of one month when month is given (not 0).
+        """
+        if month is None or month == 0:
+            return date(year, 1, 1), date(year + 1, 1, 1)
+
+        start: date = date(year, month, 1)
+        end: date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+        return start, end
+
+    def _copy_transaction_records(self, records: list[dict], db: Session) -> list[int]:
+        """
+        PostgreSQL bulk insert: COPY the records into a temporary staging table, then move them
+        into the transactions table with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        The staging table lives until the import transaction commits.
+        """
+        # COPY bypasses the Python-side column defaults, so fill in the timestamps here
+        now: datetime = datetime.now()
+        columns: list[str] = [*records[0], "time_created", "time_updated"]
+        column_list: str = ", ".join(columns)
+
+        buffer: StringIO = StringIO()
+        # Quote every value except None, so empty strings stay empty strings and None becomes NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+        writer.writerows([*record.values(), now, now] for record in records)
+        buffer.seek(0)
+
+        table: str = TransactionSchema.__tablename__
+        db.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {COPY_STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA"
+        ))
+        db.execute(text(f"TRUNCATE {COPY_STAGING_TABLE}"))
+
+        # COPY runs on the DBAPI (psycopg2) connection of the session, inside the same transaction
+        dbapi_connection = db.connection().connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {COPY_STAGING_TABLE} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+        return db.scalars(text(
+            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {COPY_STAGING_TABLE} "
+            f"ON CONFLICT (fingerprint) DO NOTHING RETURNING id"
+        )).all()
  
     # ======================================================================================================== #
 #                                       INFORMATION FUNCTIONS
     # ======================================================================================================== # 
-    from decimal import Decimal
-
-    def calculate_total_amount_of_transactions(self, db: Session, account: AccountSchema) -> dict[str, float]:
-        # Get transactions from the db
-        iban: str = self.account_service.unformat_IBAN(account.iban)
-        transaction: list[TransactionSchema] = self.get_all_transactions(db=db, iban=iban, as_schema=True)
-
-        total_dict: dict[str, float] = {}
-        for tx in transaction:
-            tx_category: CategorySchema = tx.category
-            if tx.category is not None:
-                tx_category_type: CategoryTypeSchema = tx_category.category_type
-                tx_category_type_name: str = tx_category_type.name
-
-                if tx_category_type_name not in total_dict.keys():
-                    total_dict[tx_category_type_name] = tx.value
-                
-                else:
-                    total_dict[tx_category_type_name] += tx.value
-
-        return total_dict
\ No newline at end of file
+
+    def calculate_total_amount_of_transactions(self, db: Session, account: AccountSchema, year: int | None = None, month: int | None = None) -> dict[str, Decimal]:
+        """
+        Sum the values of the transactions of an account per category type, read from the monthly summaries.
+        Transactions without a category are not counted. The period is filtered like get_all_transactions.
+        """
+        totals_cents: dict[str, int] = self.summary_service.get_totals_per_category_type(db=db, account_id=account.id, year=year, month=month)
+
+        return {category_type_name: from_cents(cents) for category_type_name, cents in totals_cents.items()}
@@ -0,0 +1,61 @@
+from dataclasses import dataclass, field
+from exceptions.exceptions import UnknownBankFormatException
+
+# ======================================================================================================== #
+#                                       BANK PROFILES
+# ======================================================================================================== #
+# A bank profile describes the CSV export of one bank. The importer only reads the columns a profile
+# declares and renames them to these canonical names:
+#   owner_iban, booking_date, counterpart_name, amount, description
+# Supporting another bank means adding its profile to BANK_PROFILES.
+
+@dataclass(frozen=True)
+class BankProfile:
+    name: str
+
+    # Canonical column name -> column name in the export
+    columns: dict[str, str] = field(default_factory=dict)
+
+    delimiter: str = ";"
+    decimal: str = ","
+    thousands: str | None = None
+    # Format of booking_date, detected from the data when None
+    date_format: str | None = None
+    encoding: str = "utf-8"
+
+    def matches(self, header: list[str]) -> bool:
+        return set(self.columns.values()).issubset(header)
+
+BANK_PROFILES: list[BankProfile] = [
+    # Dutch-language Belgian export, the layout the importer was originally written for
+    BankProfile(
+        name="be_nl",
+        columns={
+            "owner_iban": "Rekening",
+            "booking_date": "Boekingsdatum",
+            "counterpart_name": "Naam tegenpartij bevat",
+            "amount": "Bedrag",
+            "description": "Mededelingen",
+        },
+        delimiter=";",
+        decimal=",",
+        date_format="%d/%m/%Y",
+    ),
+]
+
+# ======================================================================================================== #
+#                                       HELPER FUNCTIONS
+# ======================================================================================================== #
+
+def sniff_bank_profile(header_line: bytes) -> BankProfile:
+    """
+    Select the profile whose columns all appear in the header line of an export.
+    """
+    for profile in BANK_PROFILES:
+        header_text: str = header_line.decode(profile.encoding, errors="replace").lstrip("\ufeff").strip()
+        header: list[str] = [column.strip().strip('"') for column in header_text.split(profile.delimiter)]
+
+        if profile.matches(header):
+            return profile
+
+    raise UnknownBankFormatException(header_line.decode("utf-8", errors="replace").strip())
@@ -0,0 +1,264 @@
+from pandas import to_datetime, DataFrame, RangeIndex, Series
+from pandas.arrays import IntegerArray
+from typing import BinaryIO, Iterator, NamedTuple
+from decimal import Decimal
+from datetime import date, datetime
+from utils.logging import setup_loggers
+from utils.bank_profiles import BankProfile
+from hashlib import sha256
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import re
+
+# ======================================================================================================== #
+#                                       CSV PARSING FUNCTIONS
+# ======================================================================================================== #
+# These functions do not touch the database, so the CSV import can run them in worker processes.
+# Keep this module free of database imports: spawned workers import it from scratch.
+
+logger = setup_loggers()
+
+# Date formats found in bank exports, in order of preference when a sample matches several
+DATE_FORMATS: tuple[str, ...] = ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y-%m-%d", "%Y/%m/%d")
+# Number of values used to detect the date format of a column
+DATE_SAMPLE_SIZE: int = 200
+# Bytes pyarrow parses per record batch
+READ_BLOCK_SIZE: int = 4 * 1024 * 1024
+# An amount once its separators are normalized: sign, integer digits (at most 10, like Numeric(12, 2)) and fraction digits
+AMOUNT_PATTERN: str = r"^(?P<sign>[+-]?)(?P<units>\d{0,10})(?:\.(?P<fraction>\d*))?$"
+
+class PreparedSlice(NamedTuple):
+    transactions: DataFrame
+    rejected: list[str]
+
+def read_export(stream: BinaryIO, profile: BankProfile, chunk_size: int | None = None) -> Iterator[DataFrame]:
+    """
+    Read a bank export with the multithreaded pyarrow CSV reader. Only the columns of the profile
+    are parsed (as strings, no type inference) and renamed to their canonical names.
+
+    Yields:
+        DataFrame: Chunks of about chunk_size rows (all rows when None), indexed by their row number in the file.
+    """
+    export_columns: dict[str, str] = {column: canonical for canonical, column in profile.columns.items()}
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(encoding=profile.encoding, block_size=READ_BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(delimiter=profile.delimiter),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(export_columns),
+            column_types={column: pa.string() for column in export_columns},
+        ),
+    )
+
+    batches: list[pa.RecordBatch] = []
+    n_buffered: int = 0
+    n_read: int = 0
+    for batch in reader:
+        batches.append(batch)
+        n_buffered += batch.num_rows
+
+        if chunk_size is not None and n_buffered >= chunk_size:
+            yield _batches_to_df(batches, export_columns, start=n_read)
+            n_read += n_buffered
+            batches, n_buffered = [], 0
+
+    if batches:
+        yield _batches_to_df(batches, export_columns, start=n_read)
+
+def _batches_to_df(batches: list[pa.RecordBatch], export_columns: dict[str, str], start: int) -> DataFrame:
+    df: DataFrame = pa.Table.from_batches(batches).to_pandas().rename(columns=export_columns)
+    df.index = RangeIndex(start, start + len(df))
+
+    return df
+
+def prepare_transactions(df: DataFrame, profile: BankProfile, date_format: str | None = None) -> PreparedSlice:
+    """
+    Clean a bank export slice (canonical columns) and parse its columns into transaction values.
+    Rows with a date or an amount that cannot be parsed are left out and reported instead.
+
+    Args:
+        df (DataFrame): A slice of the export, indexed by its row number in the file.
+        profile (BankProfile): The bank profile of the export.
+        date_format (str | None): Format of booking_date, the profile's or detected from the slice when None.
+
+    Returns:
+        PreparedSlice: The transactions (owner_iban, counterpart_name, value, value_cents, date_executed,
+            description, fingerprint_key, fingerprint_occurrence and fingerprint columns) and a message per rejected row.
+    """
+    df = clean_df(df)
+
+    dates: Series = normalize_dates(df["booking_date"], date_format=date_format or profile.date_format)
+    cents: Series = normalize_amounts(df["amount"], decimal=profile.decimal, thousands=profile.thousands)
+
+    invalid_dates: Series = dates.isna()
+    invalid_amounts: Series = cents.isna() & ~invalid_dates
+    # +2: the header line and 1-based line numbers
+    rejected_rows: dict[int, str] = {
+        **{index: f"Line {index + 2}: unrecognized date '{value}'" for index, value in df.loc[invalid_dates, "booking_date"].items()},
+        **{index: f"Line {index + 2}: unrecognized amount '{value}'" for index, value in df.loc[invalid_amounts, "amount"].items()},
+    }
+    rejected: list[str] = [rejected_rows[index] for index in sorted(rejected_rows)]
+    if rejected_rows:
+        valid: Series = ~(invalid_dates | invalid_amounts)
+        df, dates, cents = df[valid], dates[valid], cents[valid]
+
+    prepared: DataFrame = DataFrame({
+        "owner_iban": df["owner_iban"],
+        "counterpart_name": df["counterpart_name"],
+        "value": cents_to_decimals(cents),
+        "value_cents": cents.astype("int64"),
+        "date_executed": dates,
+        "description": df["description"],
+    })
+    prepared["fingerprint_key"] = [
+        fingerprint_key(*values)
+        for values in zip(prepared["owner_iban"], prepared["date_executed"], prepared["value"], prepared["counterpart_name"], prepared["description"])
+    ]
+    # Rows with the same key are numbered in file order within the slice. The importer adds the
+    # occurrences of earlier chunks, and re-fingerprints only the (rare) rows that have them
+    prepared["fingerprint_occurrence"] = prepared.groupby("fingerprint_key", sort=False).cumcount()
+    prepared["fingerprint"] = [fingerprint(key, occurrence) for key, occurrence in zip(prepared["fingerprint_key"], prepared["fingerprint_occurrence"])]
+
+    return PreparedSlice(prepared, rejected)
+
+def clean_df(df: DataFrame) -> DataFrame:
+    # The slice is not shared with the caller, so clean it in place
+    df["description"] = df["description"].fillna("")
+    df["counterpart_name"] = df["counterpart_name"].fillna("").str.lower()
+
+    return df
+
+def normalize_amounts(amounts: Series, decimal: str = ",", thousands: str | None = None) -> Series:
+    """
+    Convert an amount column with the given decimal and thousands separators to integer cents, column-wise:
+    pyarrow splits every value in its sign, integer and fraction digits, which are combined as integer arrays.
+    Fractions beyond cents are rounded half away from zero, like to_cents.
+
+    Returns:
+        Series: Nullable Int64 cents, <NA> where the value is not an amount.
+    """
+    normalized: pa.Array = pc.utf8_trim_whitespace(pa.array(amounts, type=pa.string(), from_pandas=True))
+    if thousands:
+        normalized = pc.replace_substring(normalized, pattern=thousands, replacement="")
+    if decimal != ".":
+        normalized = pc.replace_substring(normalized, pattern=decimal, replacement=".")
+
+    # Null where the value does not match, and for missing values
+    parts: pa.StructArray = pc.extract_regex(normalized, AMOUNT_PATTERN)
+    units: pa.Array = pc.struct_field(parts, "units").fill_null("")
+    fraction: pa.Array = pc.struct_field(parts, "fraction").fill_null("")
+    # A sign or a decimal separator alone is not an amount
+    valid: np.ndarray = parts.is_valid().to_numpy(zero_copy_only=False) & (pc.add(pc.utf8_length(units), pc.utf8_length(fraction)).to_numpy() > 0)
+
+    # The leading "0" makes an empty integer part parse as 0
+    unit_values: np.ndarray = pc.cast(pc.binary_join_element_wise("0", units, ""), pa.int64()).to_numpy()
+    # The first three fraction digits, right padded: thousandths of the unit
+    thousandths: np.ndarray = pc.cast(pc.utf8_slice_codeunits(pc.utf8_rpad(fraction, width=3, padding="0"), 0, 3), pa.int64()).to_numpy()
+    negative: np.ndarray = pc.equal(pc.struct_field(parts, "sign").fill_null(""), "-").to_numpy(zero_copy_only=False)
+
+    cents: np.ndarray = unit_values * 100 + thousandths // 10 + (thousandths % 10 >= 5)
+    cents = np.where(negative, -cents, cents)
+
+    return Series(IntegerArray(cents, mask=~valid), index=amounts.index)
+
+def cents_to_decimals(cents: Series) -> np.ndarray:
+    """
+    Convert an integer cents column to exact Decimal amounts with two decimals, like from_cents.
+
+    Returns:
+        np.ndarray: The Decimal objects, in the order of cents.
+    """
+    # Multiplying by 0.01 only shifts the scale of the decimals, so it is exact
+    amounts: pa.Array = pc.multiply(pa.array(cents, type=pa.int64()).cast(pa.decimal128(19, 0)), pa.scalar(Decimal("0.01")))
+    return amounts.to_numpy(zero_copy_only=False)
+
+def detect_date_format(dates: Series) -> str | None:
+    """
+    Pick the format of DATE_FORMATS that parses most values of a sample of the column.
+    """
+    sample: Series = dates.dropna().head(DATE_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+
+    scores: dict[str, int] = {fmt: to_datetime(sample, format=fmt, errors="coerce").notna().sum() for fmt in DATE_FORMATS}
+    best_format: str = max(scores, key=scores.get)
+
+    return best_format if scores[best_format] > 0 else None
+
+def normalize_dates(dates: Series, date_format: str | None = None) -> Series:
+    """
+    Parse a date column in one vectorized pass with date_format (detected from a sample when None).
+    Only rows that do not match are sent through convert_to_ISO_format. Rows that still fail are NaT.
+    """
+    date_format = date_format or detect_date_format(dates)
+    parsed: Series = to_datetime(dates, format=date_format or DATE_FORMATS[0], errors="coerce")
+
+    failed: Series = parsed.isna()
+    if failed.any():
+        parsed[failed] = to_datetime(dates[failed].map(_try_convert_to_ISO_format), format="%Y-%m-%d", errors="coerce")
+
+    return parsed.dt.date
+
+def _try_convert_to_ISO_format(date_str: str) -> str | None:
+    try:
+        return convert_to_ISO_format(date_str)
+    except ValueError:
+        return None
+
+def convert_to_ISO_format(date_str: str) -> str:
+    """
+    Convert a date string to ISO format (YYYY-MM-DD).
+    Accepts common formats like DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD and falls
+    back to splitting non-digit separators. Always zero-pads month/day.
+    """
+    try:
+        s = str(date_str).strip()
+        # try common exact formats first
+        for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%Y/%m/%d"):
+            try:
+                return datetime.strptime(s, fmt).date().isoformat()
+            except ValueError:
+                continue
+
+        # fallback: split by non-digit characters and reconstruct
+        parts = re.split(r"\D+", s)
+        parts = [p for p in parts if p]
+        if len(parts) >= 3:
+            # prefer day, month, year unless year looks like it's first
+            if len(parts[0]) == 4:
+                y, m, d = parts[0], parts[1], parts[2]
+            else:
+                d, m, y = parts[0], parts[1], parts[2]
+
+            return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
+
+        raise ValueError(f"Unrecognized date format: {date_str}")
+
+    except Exception as e:
+        logger.error(f"Error converting date to ISO format: {e} (input: {date_str})")
+        raise e
+
+# ======================================================================================================== #
+#                                       FINGERPRINT FUNCTIONS
+# ======================================================================================================== #
+
+def fingerprint_key(owner_iban: str, date_executed: date, value: Decimal, counterpart_name: str | None, description: str | None) -> str:
+    """
+    Identity of a transaction: owner IBAN, date, amount, counterpart and description.
+    """
+    return "|".join((
+        owner_iban.replace(" ", "").upper(),
+        date_executed.isoformat(),
+        f"{value:.2f}",
+        counterpart_name or "",
+        description or "",
+    ))
+
+def fingerprint(key: str, occurrence: int) -> str:
+    """
+    SHA-256 of a fingerprint key. The occurrence numbers rows with the same key
+    (true same-day duplicates) in statement order, so they get distinct fingerprints.
+    """
+    return sha256(f"{key}|{occurrence}".encode()).hexdigest()
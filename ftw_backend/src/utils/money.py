@@ -0,0 +1,25 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+# ======================================================================================================== #
+#                                       MONEY FUNCTIONS
+# ======================================================================================================== #
+# Amounts are stored and summed as integer cents (TransactionSchema.value_cents, MonthlySummarySchema.total_cents).
+# Convert back to Decimal only where a model for the API is built.
+
+def to_cents(value: Decimal | None) -> int | None:
+    """
+    Convert an amount to integer cents, rounding half away from zero like Numeric(12, 2) does.
+    """
+    if value is None:
+        return None
+
+    return int(Decimal(value).scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+
+def from_cents(cents: int | None) -> Decimal | None:
+    """
+    Convert integer cents to an exact Decimal amount with two decimals.
+    """
+    if cents is None:
+        return None
+
+    return Decimal(int(cents)).scaleb(-2)
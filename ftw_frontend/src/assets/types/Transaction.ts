@@ -30,3 +30,17 @@ export class TransactionTableView {
       : null;
   }
 }
+
+export interface TransactionPage {
+  items: TransactionTableView[];
+  next_cursor: string | null;
+}
+
+export interface TransactionStats {
+  n_transactions: number;
+  n_transactions_this_year: number;
+  n_unprocessed: number;
+  last_date_executed: string | null;
+}
+
+export type SortOrder = "asc" | "desc";
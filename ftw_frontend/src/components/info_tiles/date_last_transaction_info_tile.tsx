@@ -1,5 +1,4 @@
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
-import { TransactionTableView } from "@/assets/types/Transaction";
 
 const dateTimeFormatter = new Intl.DateTimeFormat("nl-BE", {
   year: "numeric",
@@ -10,17 +9,6 @@ const dateTimeFormatter = new Intl.DateTimeFormat("nl-BE", {
   second: "2-digit",
 });
 
-function get_latest_transaction(transactions: TransactionTableView[]) {
-  if (transactions.length === 0) return null;
-  let latest = transactions[0];
-  for (const transaction of transactions) {
-    if (transaction.date_executed > latest.date_executed) {
-      latest = transaction;
-    }
-  }
-  return latest;
-}
-
 function get_days_between(dt1: Date, dt2: Date): number {
   return Math.floor(
     (Date.UTC(dt2.getFullYear(), dt2.getMonth(), dt2.getDate()) -
@@ -30,15 +18,15 @@ function get_days_between(dt1: Date, dt2: Date): number {
 }
 
 interface Props {
-  transactions: TransactionTableView[];
+  last_date_executed: Date | null;
 }
 
-export default function DateLastTransactionInfoTile({ transactions }: Props) {
+export default function DateLastTransactionInfoTile({
+  last_date_executed,
+}: Props) {
   const current_date = new Date();
-  const latest_transaction: Transaction | null =
-    get_latest_transaction(transactions);
-  const time_passed: number = latest_transaction?.date_executed
-    ? get_days_between(latest_transaction.date_executed, current_date)
+  const time_passed: number = last_date_executed
+    ? get_days_between(last_date_executed, current_date)
     : 0;
 
   return (
@@ -49,12 +37,12 @@ export default function DateLastTransactionInfoTile({ transactions }: Props) {
         </CardTitle>
       </CardHeader>
       <CardContent className="-mt-4 text-2xl font-semibold">
-        {latest_transaction ? (
+        {last_date_executed ? (
           <div>
             <div className="font-bold pb-1">
               {
                 dateTimeFormatter
-                  .format(latest_transaction.date_executed)
+                  .format(last_date_executed)
                   .split(",")[0]
               }
             </div>
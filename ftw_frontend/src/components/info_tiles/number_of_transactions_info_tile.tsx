@@ -1,40 +1,31 @@
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { TransactionTableView } from "@/assets/types/Transaction";
-import { useState, useEffect } from "react";
 
 interface Props {
-  transactions: TransactionTableView[];
+  n_transactions: number;
+  n_transactions_this_year: number;
+  n_unprocessed: number;
 }
 
-function get_n_transactions_this_year(transactions: TransactionTableView[]) {
+// Counts for pages that already hold the full list of transactions
+export function count_transactions(
+  transactions: TransactionTableView[],
+): Props {
   const currentYear = new Date().getFullYear();
-  return transactions.filter(
-    (t) => t.date_executed.getFullYear() === currentYear,
-  ).length;
+  return {
+    n_transactions: transactions.length,
+    n_transactions_this_year: transactions.filter(
+      (t) => t.date_executed.getFullYear() === currentYear,
+    ).length,
+    n_unprocessed: transactions.filter((t) => t.category_id == null).length,
+  };
 }
 
-function get_unprocessed_transactions(transactions: TransactionTableView[]) {
-  const unprocessed_transactions = transactions.filter(
-    (t) => t.category_id == null,
-  );
-  console.log(
-    "N° total transactions:",
-    transactions.length,
-    "\nN° unprocessed transactions:",
-    unprocessed_transactions.length,
-  );
-  return unprocessed_transactions;
-}
-
-export default function NTransactionsInfoTile({ transactions }: Props) {
-  const [unprocessed_transactions, setUnprocessedTransactions] = useState<
-    TransactionTableView[]
-  >([]);
-
-  useEffect(() => {
-    setUnprocessedTransactions(get_unprocessed_transactions(transactions));
-  }, [transactions]);
-
+export default function NTransactionsInfoTile({
+  n_transactions,
+  n_transactions_this_year,
+  n_unprocessed,
+}: Props) {
   return (
     <Card className="flex-1 px-2 ">
       <CardHeader>
@@ -42,14 +33,14 @@ export default function NTransactionsInfoTile({ transactions }: Props) {
       </CardHeader>
       <CardContent className="-mt-4 text-2xl">
         <span className="flex gap-3">
-          <div className="font-bold pb-1">{transactions.length}</div>
+          <div className="font-bold pb-1">{n_transactions}</div>
           <div className="flex font-normal text-base items-center align-center">
-            ({get_n_transactions_this_year(transactions)} this year)
+            ({n_transactions_this_year} this year)
           </div>
         </span>
-        {unprocessed_transactions.length > 0 && (
+        {n_unprocessed > 0 && (
           <div className="flex items-center text-red-500 font-semibold text-xl mt-2">
-            {unprocessed_transactions.length} transactions are unprocessed !!
+            {n_unprocessed} transactions are unprocessed !!
           </div>
         )}
       </CardContent>
@@ -92,17 +92,16 @@ export default function TransactionBulkEditDialog(
     category_id: number,
   ) {
     if (!transactions) return;
-    const resp = await fetch(
-      `http://localhost:8000/category/${category_id}/add_transactions`,
-      {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "active-account-id": activeAccount ? activeAccount.id.toString() : "",
-        },
-        body: JSON.stringify(transactions),
+    // "None" (or no choice) removes the category
+    const changes = { category_id: category_id ? category_id : null };
+    const resp = await fetch("http://localhost:8000/transaction/batch", {
+      method: "PATCH",
+      headers: {
+        "Content-Type": "application/json",
+        "active-account-id": activeAccount ? activeAccount.id.toString() : "",
       },
-    );
+      body: JSON.stringify(transactions.map((id) => ({ id, changes }))),
+    });
 
     if (!resp.ok) {
       throw new Error(`Failed to save transaction: ${resp.statusText}`);
@@ -1,4 +1,4 @@
-import { TransactionTableView } from "@/assets/types/Transaction";
+import { TransactionStats } from "@/assets/types/Transaction";
 
 import TotalTrackingBalanceInfoTile from "../info_tiles/total_tracking_balance_info_tile";
 import NTransactionsInfoTile from "../info_tiles/number_of_transactions_info_tile";
@@ -12,22 +12,32 @@ interface totalsType {
 }
 
 interface TransactionProps {
-  transactions: TransactionTableView[];
+  stats: TransactionStats | null;
   totals: totalsType;
 }
 
 export default function TransactionInfoTiles(
   transactionProps: TransactionProps,
 ) {
-  const transactions: TransactionTableView[] = transactionProps.transactions;
+  const stats: TransactionStats | null = transactionProps.stats;
   const totals: totalsType = transactionProps.totals;
 
   return (
     <div className="rounded-lg py-2">
       <div className="flex gap-4">
         <TotalTrackingBalanceInfoTile {...totals} />
-        <NTransactionsInfoTile transactions={transactions} />
-        <DateLastTransactionInfoTile transactions={transactions} />
+        <NTransactionsInfoTile
+          n_transactions={stats?.n_transactions ?? 0}
+          n_transactions_this_year={stats?.n_transactions_this_year ?? 0}
+          n_unprocessed={stats?.n_unprocessed ?? 0}
+        />
+        <DateLastTransactionInfoTile
+          last_date_executed={
+            stats?.last_date_executed
+              ? new Date(stats.last_date_executed)
+              : null
+          }
+        />
       </div>
     </div>
   );
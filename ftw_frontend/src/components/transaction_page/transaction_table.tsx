@@ -5,7 +5,6 @@ import { useEffect } from "react";
 import {
   useReactTable,
   getCoreRowModel,
-  getPaginationRowModel,
   getSortedRowModel,
   getFilteredRowModel,
   flexRender,
@@ -30,7 +29,7 @@ import {
   TableRow,
 } from "@/components/ui/table";
 
-import { TransactionTableView } from "@/assets/types/Transaction";
+import { TransactionTableView, SortOrder } from "@/assets/types/Transaction";
 import TransactionInput from "@/components/transaction_page/transaction_input_dialog";
 import { Input } from "../ui/input";
 import { Button } from "../ui/button";
@@ -38,11 +37,22 @@ import { Drawer, DrawerContent, DrawerTrigger } from "../ui/drawer";
 import type { RowSelectionState } from "@tanstack/react-table";
 import { FaTrash } from "react-icons/fa";
 import TransactionBulkEditDialog from "./transaction_bulk_edit";
+import { useAccount } from "../context/AccountContext";
 
 interface TransactionListProps {
-  transactions: TransactionTableView[];
+  transactions: TransactionTableView[]; // the current page
   onEditTransaction: (id: number) => void; // new
   onSaveEdit: () => void;
+
+  // Pages are loaded by the parent, sorted on date by the server
+  pageIndex: number;
+  pageSize: number;
+  hasNextPage: boolean;
+  order: SortOrder;
+  onNextPage: () => void;
+  onPreviousPage: () => void;
+  onPageSizeChange: (size: number) => void;
+  onOrderChange: (order: SortOrder) => void;
 }
 
 const currencyFormatter = new Intl.NumberFormat("nl-BE", {
@@ -59,7 +69,7 @@ const dateTimeFormatter = new Intl.DateTimeFormat("nl-BE", {
 // --------------------- //
 // Table Column Defs
 // --------------------- //
-const getColumns = (): ColumnDef<TransactionTableView>[] => [
+const getColumns = (rowOffset: number): ColumnDef<TransactionTableView>[] => [
   {
     id: "select",
     header: ({ table }) => (
@@ -87,7 +97,7 @@ const getColumns = (): ColumnDef<TransactionTableView>[] => [
   {
     id: "id",
     header: "ID",
-    cell: ({ row }) => row.index + 1, // display index + 1
+    cell: ({ row }) => rowOffset + row.index + 1, // display index + 1
   },
   {
     accessorKey: "category_type_name",
@@ -146,7 +156,16 @@ export default function TransactionTable({
   transactions,
   onEditTransaction,
   onSaveEdit,
+  pageIndex,
+  pageSize,
+  hasNextPage,
+  order,
+  onNextPage,
+  onPreviousPage,
+  onPageSizeChange,
+  onOrderChange,
 }: TransactionListProps) {
+  const { activeAccount } = useAccount();
   const [rowSelection, setRowSelection] = React.useState<RowSelectionState>({});
   const [selectedTransactions, setSelectedTransactions] = React.useState<
     number[]
@@ -157,8 +176,6 @@ export default function TransactionTable({
   );
   const [columnVisibility, setColumnVisibility] =
     React.useState<VisibilityState>({});
-  const [pageSize, setPageSize] = React.useState(25);
-  const [pageIndex, setPageIndex] = React.useState(0);
 
   useEffect(() => {
     console.log("TransactionTable: transactions payload", transactions);
@@ -166,11 +183,10 @@ export default function TransactionTable({
 
   const table = useReactTable({
     data: transactions,
-    columns: getColumns(),
+    columns: getColumns(pageIndex * pageSize),
     getCoreRowModel: getCoreRowModel(),
     getSortedRowModel: getSortedRowModel(),
     getFilteredRowModel: getFilteredRowModel(),
-    getPaginationRowModel: getPaginationRowModel(),
     onRowSelectionChange: setRowSelection,
     onSortingChange: setSorting,
     onColumnFiltersChange: setColumnFilters,
@@ -180,26 +196,32 @@ export default function TransactionTable({
       sorting,
       columnFilters,
       columnVisibility,
-      pagination: {
-        pageIndex,
-        pageSize,
-      },
-    },
-    onPaginationChange: (updater) => {
-      const newPagination =
-        typeof updater === "function"
-          ? updater({ pageIndex, pageSize })
-          : updater;
-      setPageIndex(newPagination.pageIndex);
-      setPageSize(newPagination.pageSize);
     },
   });
 
+  // The date order is applied by the server across all pages, the other columns sort the current page
+  function toggleSorting(columnId: string, event: unknown) {
+    if (columnId === "date_executed") {
+      setSorting([]);
+      onOrderChange(order === "desc" ? "asc" : "desc");
+    } else {
+      table.getColumn(columnId)?.getToggleSortingHandler()?.(event);
+    }
+  }
+
+  function getSortDirection(columnId: string) {
+    if (columnId === "date_executed") {
+      return sorting.length === 0 ? order : false;
+    }
+    return table.getColumn(columnId)?.getIsSorted();
+  }
+
   async function deleteTransactions(ids: number[]) {
     await fetch("http://localhost:8000/transaction", {
       method: "DELETE",
       headers: {
         "Content-Type": "application/json",
+        "active-account-id": activeAccount ? activeAccount.id.toString() : "",
       },
       body: JSON.stringify(ids),
     });
@@ -212,7 +234,7 @@ export default function TransactionTable({
     onSaveEdit();
   }
 
-  async function deleteAllTransactions() {
+  async function deletePageTransactions() {
     const transaction_ids: number[] = [];
     transactions.map((t: TransactionTableView) => {
       transaction_ids.push(t.id);
@@ -270,10 +292,10 @@ export default function TransactionTable({
               type="button"
               variant="destructive"
               className="text-lg"
-              onClick={deleteAllTransactions}
+              onClick={deletePageTransactions}
             >
               <FaTrash />
-              Delete All
+              Delete page
             </Button>
           )}
           {selectedTransactions.length > 1 && (
@@ -296,7 +318,7 @@ export default function TransactionTable({
                 {headerGroup.headers.map((header) => (
                   <TableHead
                     key={header.id}
-                    onClick={header.column.getToggleSortingHandler()}
+                    onClick={(e) => toggleSorting(header.column.id, e)}
                   >
                     <span className="flex items-center gap-2">
                       {header.isPlaceholder
@@ -304,10 +326,10 @@ export default function TransactionTable({
                         : header.column.columnDef.header instanceof Function
                           ? header.column.columnDef.header(header.getContext())
                           : header.column.columnDef.header}
-                      {header.column.getIsSorted() === "asc" && (
+                      {getSortDirection(header.column.id) === "asc" && (
                         <ChevronUp className="w-4 h-4" />
                       )}
-                      {header.column.getIsSorted() === "desc" && (
+                      {getSortDirection(header.column.id) === "desc" && (
                         <ChevronDown className="w-4 h-4" />
                       )}
                     </span>
@@ -346,19 +368,16 @@ export default function TransactionTable({
             <span className="flex items-center text-sm">
               <button
                 className="px-3 py-1 border rounded disabled:opacity-50"
-                onClick={() => table.previousPage()}
-                disabled={!table.getCanPreviousPage()}
+                onClick={onPreviousPage}
+                disabled={pageIndex === 0}
               >
                 Previous
               </button>
-              <p className="text-muted-foreground">
-                Page {table.getState().pagination.pageIndex + 1} of{" "}
-                {table.getPageCount()}
-              </p>
+              <p className="text-muted-foreground">Page {pageIndex + 1}</p>
               <button
                 className="px-3 py-1 border rounded disabled:opacity-50"
-                onClick={() => table.nextPage()}
-                disabled={!table.getCanNextPage()}
+                onClick={onNextPage}
+                disabled={!hasNextPage}
               >
                 Next
               </button>
@@ -368,10 +387,7 @@ export default function TransactionTable({
             Transactions shown:
             <select
               value={pageSize}
-              onChange={(e) => {
-                setPageSize(Number(e.target.value));
-                table.setPageSize(Number(e.target.value));
-              }}
+              onChange={(e) => onPageSizeChange(Number(e.target.value))}
               className="ml-2 p-1 border rounded"
             >
               {[10, 25, 50, 100].map((size) => (
@@ -6,7 +6,18 @@ import axios, { type AxiosProgressEvent, type AxiosRequestConfig } from "axios";
 import { Progress } from "../ui/progress";
 import { useAccount } from "../context/AccountContext";
 
-type uploadStatus = "idle" | "uploading" | "success" | "error";
+type uploadStatus = "idle" | "uploading" | "processing" | "success" | "error";
+
+interface ImportJob {
+  id: string;
+  status: "pending" | "running" | "completed" | "failed";
+  rows_processed: number;
+  rows_inserted: number;
+  rows_skipped: number;
+  errors: string[];
+}
+
+const IMPORT_POLL_INTERVAL_MS = 1000;
 
 interface CsvUploadHandlerProps {
   onSuccesfullUpload?: () => void;
@@ -17,6 +28,7 @@ export default function CsvUploadHandler(props: CsvUploadHandlerProps) {
   const [file, setFile] = useState<File | null>(null);
   const [status, setStatus] = useState<uploadStatus>("idle");
   const [uploadProgress, setUploadProgress] = useState<number>(0);
+  const [importJob, setImportJob] = useState<ImportJob | null>(null);
   const { activeAccount } = useAccount();
 
   function handeFileChange(e: ChangeEvent<HTMLInputElement>) {
@@ -25,6 +37,29 @@ export default function CsvUploadHandler(props: CsvUploadHandlerProps) {
     }
   }
 
+  async function waitForImport(jobId: string): Promise<ImportJob> {
+    for (;;) {
+      const resp = await axios.get<ImportJob>(
+        "http://localhost:8000/transaction/import/" + jobId,
+        {
+          headers: {
+            "active-account-id": activeAccount
+              ? activeAccount.id.toString()
+              : "",
+          },
+        },
+      );
+      setImportJob(resp.data);
+
+      if (resp.data.status === "completed" || resp.data.status === "failed") {
+        return resp.data;
+      }
+      await new Promise((resolve) =>
+        setTimeout(resolve, IMPORT_POLL_INTERVAL_MS),
+      );
+    }
+  }
+
   async function handleFileUpload() {
     if (!file) return;
 
@@ -51,10 +86,24 @@ export default function CsvUploadHandler(props: CsvUploadHandlerProps) {
     };
 
     await axios
-      .post("http://localhost:8000/transaction/upload_csv", formData, options)
-      .then(() => {
-        setStatus("success");
+      .post<ImportJob>(
+        "http://localhost:8000/transaction/upload_csv",
+        formData,
+        options,
+      )
+      .then(async (resp) => {
+        // The upload returns right away, the import itself runs in the background
+        setStatus("processing");
         setUploadProgress(100);
+        const job = await waitForImport(resp.data.id);
+
+        if (job.status === "failed") {
+          setStatus("error");
+          setErrorMsg(job.errors.join(" ") || "The import failed.");
+          return;
+        }
+
+        setStatus("success");
         setFile(null);
         if (props.onSuccesfullUpload) {
           props.onSuccesfullUpload();
@@ -94,6 +143,12 @@ export default function CsvUploadHandler(props: CsvUploadHandlerProps) {
           <Progress value={uploadProgress} className="mt-2" />
         </div>
       )}
+      {status === "processing" && (
+        <div className="pl-2 pt-1 text-yellow-400">
+          Importing transactions... ({importJob?.rows_processed ?? 0} rows
+          processed)
+        </div>
+      )}
       {status === "error" && (
         <div className="pl-2 pt-1 text-red-600">
           {errorMsg || "An error occurred while uploading the file."}
@@ -102,6 +157,12 @@ export default function CsvUploadHandler(props: CsvUploadHandlerProps) {
       {status === "success" && (
         <div className="pl-2 pt-1 text-green-600 font-semibold">
           Succesfully uploaded file...
+          {importJob && (
+            <p className="font-normal">
+              {importJob.rows_inserted} new transactions,{" "}
+              {importJob.rows_skipped} already imported.
+            </p>
+          )}
         </div>
       )}
     </div>
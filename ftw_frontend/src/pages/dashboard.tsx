@@ -2,7 +2,9 @@ import { useEffect, useState } from "react";
 import { TransactionTableView } from "@/assets/types/Transaction";
 import { useAccount } from "@/components/context/AccountContext";
 import TotalTrackingBalanceInfoTile from "@/components/info_tiles/total_tracking_balance_info_tile";
-import NTransactionsInfoTile from "@/components/info_tiles/number_of_transactions_info_tile";
+import NTransactionsInfoTile, {
+  count_transactions,
+} from "@/components/info_tiles/number_of_transactions_info_tile";
 import SelectedPeriodInfoTile from "@/components/info_tiles/selected_period_info_tile";
 import { useTime } from "@/components/context/TimeContext";
 import TypeSummaryTile from "@/components/dashboard_page/typeSummaryTile";
@@ -142,7 +144,7 @@ export default function DashboardPage() {
       <div className="flex gap-4">
         <SelectedPeriodInfoTile />
         <TotalTrackingBalanceInfoTile {...totals} />
-        <NTransactionsInfoTile transactions={transactions} />
+        <NTransactionsInfoTile {...count_transactions(transactions)} />
       </div>
       <div className="w-full grid grid-cols-1 sm:grid-cols-2 sm:grid-rows-2 gap-4 my-4">
         {type_overview_response
@@ -1,5 +1,10 @@
 import { useEffect, useState } from "react";
-import { TransactionTableView } from "@/assets/types/Transaction";
+import {
+  TransactionTableView,
+  TransactionPage,
+  TransactionStats,
+  SortOrder,
+} from "@/assets/types/Transaction";
 import TransactionTable from "@/components/transaction_page/transaction_table";
 import TransactionInfoTiles from "@/components/transaction_page/transaction_info_tiles";
 import { useAccount } from "@/components/context/AccountContext";
@@ -21,21 +26,47 @@ const defaultTotals: totalsType = {
 
 export default function TransactionsPage() {
   const [transactions, setTransactions] = useState<TransactionTableView[]>([]);
+  const [stats, setStats] = useState<TransactionStats | null>(null);
   const [totals, setTotals] = useState<totalsType>(defaultTotals);
+  const [pageSize, setPageSize] = useState<number>(25);
+  const [order, setOrder] = useState<SortOrder>("desc");
+  // Cursor of every visited page, the first page has none
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [editTransactionId, setEditTransactionId] = useState<number | null>(
     null,
   );
   const { activeAccount } = useAccount();
 
-  async function get_transactions() {
-    const resp = await fetch("http://localhost:8000/transaction", {
+  async function get_transactions(cursor: string | null) {
+    const params = new URLSearchParams({
+      limit: pageSize.toString(),
+      order: order,
+    });
+    if (cursor) params.set("cursor", cursor);
+
+    const resp = await fetch(
+      `http://localhost:8000/transaction/page?${params}`,
+      {
+        headers: {
+          "Content-Type": "application/json",
+          "active-account-id": activeAccount?.id.toString() ?? "",
+        },
+      },
+    );
+    const data: TransactionPage = await resp.json();
+    setTransactions(data.items.map((t: any) => new TransactionTableView(t)));
+    setNextCursor(data.next_cursor);
+  }
+
+  async function get_stats() {
+    const resp = await fetch("http://localhost:8000/transaction/stats", {
       headers: {
         "Content-Type": "application/json",
         "active-account-id": activeAccount?.id.toString() ?? "",
       },
     });
-    const data = await resp.json();
-    setTransactions(data.map((t: any) => new TransactionTableView(t)));
+    setStats(await resp.json());
   }
 
   async function get_totals() {
@@ -50,30 +81,45 @@ export default function TransactionsPage() {
     setTotals(data);
   }
 
+  // Back to the first page when the account, page size or sort order changes
+  useEffect(() => {
+    setCursors([null]);
+  }, [activeAccount, pageSize, order]);
+
   useEffect(() => {
     if (!activeAccount) return; // Wait until activeAccount is set
-    get_transactions();
-  }, [activeAccount]);
+    get_transactions(cursors[cursors.length - 1]);
+  }, [cursors]);
 
   useEffect(() => {
     get_totals();
+    if (activeAccount) get_stats();
   }, [activeAccount]);
 
   async function resetTable() {
-    get_transactions();
+    get_transactions(cursors[cursors.length - 1]);
     get_totals();
+    get_stats();
     setEditTransactionId(null);
     return;
   }
 
   return (
     <div className="mx-auto px-20 py-4">
-      <TransactionInfoTiles transactions={transactions} totals={totals} />
+      <TransactionInfoTiles stats={stats} totals={totals} />
 
       <TransactionTable
         transactions={transactions}
         onEditTransaction={setEditTransactionId}
         onSaveEdit={resetTable}
+        pageIndex={cursors.length - 1}
+        pageSize={pageSize}
+        hasNextPage={nextCursor !== null}
+        order={order}
+        onNextPage={() => setCursors([...cursors, nextCursor])}
+        onPreviousPage={() => setCursors(cursors.slice(0, -1))}
+        onPageSizeChange={setPageSize}
+        onOrderChange={setOrder}
       />
 
       <TransactionEditDialog